@@ -0,0 +1,840 @@
+#!/usr/bin/env python3
+"""
+Reference Design Block Utilities for Nordic KiCad Library
+
+The schematics in blocks/*.kicad_blocks/*.kicad_block/ embed copies of the
+library symbols they use in their lib_symbols section. This module keeps
+those copies in sync with symbols/*.kicad_sym:
+- Checking embedded symbols against the library by content hash
+- Splicing current library definitions back into the block schematics
+- Extracting a BOM and net summary from each block
+
+Both files are streamed with the s-expression reader from symbol_utils, so
+neither is loaded as a full kiutils document.
+
+Usage:
+    # List stale embedded symbols in every block (exit code 1 if any)
+    python block_utils.py check
+
+    # Replace stale embedded symbols with the current library definitions
+    python block_utils.py refresh
+
+    # Write <block>.bom.csv and <block>.nets.csv for every block
+    python block_utils.py bom --output-dir build/blocks
+"""
+
+import argparse
+import hashlib
+import csv
+import json
+import math
+import re
+import sys
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple, Iterable
+
+from symbol_utils import (
+    STATS, REPO_ROOT, PinRow, iter_sexpr_elements, iter_symbol_pins, sexpr_children, sexpr_field,
+    sexpr_quote, add_instrumentation_arguments, add_jobs_argument, run_instrumented, parallel_map,
+    atomic_write,
+)
+
+
+BLOCKS_DIR = REPO_ROOT / "blocks"
+SYMBOLS_DIR = REPO_ROOT / "symbols"
+
+# Children that only affect presentation, or that newer KiCad versions add
+# with default values; they are ignored when comparing symbols
+PRESENTATION_HEADS = frozenset({
+    'effects', 'show_name', 'do_not_autoplace', 'in_pos_files',
+    'duplicate_pin_numbers_are_jumpers', 'embedded_fonts',
+})
+
+_SYMBOL_NAME_RE = re.compile(r'\(symbol\s+"((?:[^"\\]|\\.)*)"')
+_EXTENDS_RE = re.compile(r'\(extends\s+"((?:[^"\\]|\\.)*)"')
+
+
+def canonical_symbol(element: List[Any]) -> List[Any]:
+    """
+    Reduce a symbol s-expression to the parts that matter for staleness.
+
+    Properties keep only their key and value, presentation-only children are
+    dropped, the old bare 'hide' flag is written as (hide yes), and the
+    children of every (sub)symbol are sorted so pin and graphic order does
+    not matter.
+    """
+    out: List[Any] = []
+    for item in element:
+        if isinstance(item, list):
+            if item[0] in PRESENTATION_HEADS:
+                continue
+            if item[0] == 'property':
+                out.append(['property', item[1], item[2]])
+            else:
+                out.append(canonical_symbol(item))
+        elif item == 'hide' and out:
+            out.append(['hide', 'yes'])
+        else:
+            out.append(item)
+
+    if out and out[0] == 'symbol':
+        atoms = [item for item in out if not isinstance(item, list)]
+        lists = sorted((item for item in out if isinstance(item, list)),
+                       key=lambda item: json.dumps(item))
+        out = atoms + lists
+    return out
+
+
+def symbol_hash(element: List[Any]) -> str:
+    """Hash the canonical form of a symbol, ignoring any library prefix on its name."""
+    canonical = canonical_symbol(element)
+    canonical[1] = canonical[1].split(':', 1)[-1]
+    data = json.dumps(canonical, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def flatten_derived(child: List[Any], parent: List[Any]) -> List[Any]:
+    """
+    Flatten a derived symbol ((extends "parent")) the way KiCad embeds it.
+
+    The result has the parent's units (renamed after the child) and the
+    child's properties and flags.
+    """
+    own = {item[0]: item for item in child[2:]
+           if isinstance(item, list) and item[0] not in ('extends', 'property')}
+    properties = [item for item in child[2:] if isinstance(item, list) and item[0] == 'property']
+    flat: List[Any] = ['symbol', child[1]]
+    for item in parent[2:]:
+        if isinstance(item, list):
+            if item[0] == 'property':
+                flat.extend(properties)
+                properties = []
+                continue
+            if item[0] in own:
+                flat.append(own.pop(item[0]))
+                continue
+            if item[0] == 'symbol':
+                item = ['symbol', child[1] + item[1][len(parent[1]):]] + item[2:]
+        flat.append(item)
+    flat.extend(own.values())
+    flat.extend(properties)
+    return flat
+
+
+def _extends(element: List[Any]) -> Optional[str]:
+    for item in element[2:]:
+        if isinstance(item, list) and item[0] == 'extends':
+            return item[1]
+    return None
+
+
+def hash_library(library_path: str) -> Dict[str, str]:
+    """
+    Hash every symbol of a library file, keyed by 'nickname:symbol'.
+
+    Derived symbols are flattened onto their parent first; parents are
+    collected in a second streaming pass only if the library has any.
+    """
+    nickname = Path(library_path).stem
+    hashes: Dict[str, str] = {}
+    derived: Dict[str, List[Any]] = {}
+
+    for element in iter_sexpr_elements(library_path, heads=('symbol',)):
+        if _extends(element) is None:
+            hashes[f"{nickname}:{element[1]}"] = symbol_hash(element)
+        else:
+            derived[element[1]] = element
+
+    if derived:
+        wanted = {_extends(element) for element in derived.values()}
+        parents = {element[1]: element
+                   for element in iter_sexpr_elements(library_path, heads=('symbol',))
+                   if element[1] in wanted}
+        for name, element in derived.items():
+            parent = parents.get(_extends(element))
+            if parent is not None:
+                hashes[f"{nickname}:{name}"] = symbol_hash(flatten_derived(element, parent))
+
+    return hashes
+
+
+def hash_embedded_symbols(schematic_path: str) -> Dict[str, str]:
+    """Hash every symbol embedded in a schematic's lib_symbols section, keyed by lib_id."""
+    return {
+        element[1]: symbol_hash(element)
+        for element in iter_sexpr_elements(schematic_path, depth=2, heads=('symbol',),
+                                           within='lib_symbols')
+    }
+
+
+def find_block_schematics(blocks_dir: Path = BLOCKS_DIR) -> List[Path]:
+    """Find the schematic of every reference design block."""
+    return sorted(blocks_dir.glob('*.kicad_blocks/*.kicad_block/*.kicad_sch'))
+
+
+@dataclass
+class StaleSymbol:
+    """An embedded symbol that no longer matches the library."""
+    lib_id: str
+    status: str  # 'stale' or 'missing' (not in the library any more)
+    embedded_hash: str
+    library_hash: Optional[str] = None
+
+
+@dataclass
+class BlockReport:
+    """Staleness check result for one block schematic."""
+    schematic: str
+    checked: int = 0
+    stale: List[StaleSymbol] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return Path(self.schematic).stem
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {'block': self.name, **asdict(self)}
+
+
+def build_library_index(symbols_dir: Path = SYMBOLS_DIR, jobs: int = 1) -> Dict[str, str]:
+    """Hash every symbol of every library in symbols_dir, keyed by 'nickname:symbol'."""
+    index: Dict[str, str] = {}
+    with STATS.phase('index'):
+        libraries = [str(p) for p in sorted(symbols_dir.glob('*.kicad_sym'))]
+        for hashes in parallel_map(hash_library, libraries, jobs):
+            index.update(hashes)
+    STATS.count('symbols', len(index))
+    return index
+
+
+def check_blocks(schematics: List[Path], index: Dict[str, str], jobs: int = 1) -> List[BlockReport]:
+    """Compare the embedded symbols of each schematic against the library index."""
+    libraries = {lib_id.split(':', 1)[0] for lib_id in index}
+    reports = []
+    with STATS.phase('check'):
+        embedded_per_block = parallel_map(hash_embedded_symbols, [str(p) for p in schematics], jobs)
+    for schematic, embedded in zip(schematics, embedded_per_block):
+        report = BlockReport(schematic=str(schematic))
+        for lib_id, embedded_hash in sorted(embedded.items()):
+            if lib_id.split(':', 1)[0] not in libraries:
+                continue  # KiCad standard library (Device:, power:, ...)
+            report.checked += 1
+            library_hash = index.get(lib_id)
+            if library_hash is None:
+                report.stale.append(StaleSymbol(lib_id, 'missing', embedded_hash))
+            elif library_hash != embedded_hash:
+                report.stale.append(StaleSymbol(lib_id, 'stale', embedded_hash, library_hash))
+        STATS.count('embedded_symbols', report.checked)
+        reports.append(report)
+    return reports
+
+
+def _top_level_symbols(text: str) -> Dict[str, Tuple[int, int]]:
+    """Map symbol names to the spans of the top-level symbols of a library text."""
+    children, _ = sexpr_children(text, text.index('('))
+    spans = {}
+    for head, start, end in children:
+        if head == 'symbol':
+            spans[_SYMBOL_NAME_RE.match(text, start).group(1)] = (start, end)
+    return spans
+
+
+def _symbol_pieces(text: str, spans: Dict[str, Tuple[int, int]], name: str) -> List[Tuple[str, str]]:
+    """
+    Return the raw (head, text) children of a library symbol, flattening
+    derived symbols onto their parent the same way as flatten_derived().
+    """
+    start, _ = spans[name]
+    children, _ = sexpr_children(text, start)
+    pieces = [(head, text[a:b]) for head, a, b in children if head]
+    extends = next((piece for head, piece in pieces if head == 'extends'), None)
+    if extends is None:
+        return pieces
+
+    parent = _EXTENDS_RE.match(extends).group(1)
+    own = {head: piece for head, piece in pieces if head not in ('extends', 'property')}
+    properties = [(head, piece) for head, piece in pieces if head == 'property']
+    flat = []
+    for head, piece in _symbol_pieces(text, spans, parent):
+        if head == 'property':
+            flat.extend(properties)
+            properties = []
+            continue
+        if head in own:
+            flat.append((head, own.pop(head)))
+            continue
+        if head == 'symbol':
+            unit = _SYMBOL_NAME_RE.match(piece)
+            piece = ('(symbol ' + sexpr_quote(name + unit.group(1)[len(parent):])
+                     + piece[unit.end():])
+        flat.append((head, piece))
+    flat.extend(own.items())
+    flat.extend(properties)
+    return flat
+
+
+def embedded_symbol_text(library_text: str, spans: Dict[str, Tuple[int, int]],
+                         name: str, lib_id: str, depth: int) -> str:
+    """Render a library symbol as a lib_symbols entry at the given tab depth."""
+    shift = '\t' * (depth - 1)
+    inner = '\n' + '\t' * (depth + 1)
+    body = ''.join(inner + piece.replace('\n', '\n' + shift)
+                   for _, piece in _symbol_pieces(library_text, spans, name))
+    return '(symbol ' + sexpr_quote(lib_id) + body + '\n' + '\t' * depth + ')'
+
+
+def _generator_version(text: str, children: List[Tuple[str, int, int]]) -> Tuple[int, ...]:
+    """KiCad version that wrote a file, e.g. (9, 0); (0,) if it does not say."""
+    for head, start, end in children:
+        if head == 'generator_version':
+            value = text[start:end].split(None, 1)[1].rstrip(')').strip().strip('"')
+            return tuple(int(part) for part in re.findall(r'\d+', value)) or (0,)
+    return (0,)
+
+
+def _format_version(version: Tuple[int, ...]) -> str:
+    return '.'.join(map(str, version))
+
+
+def refresh_block(task: Tuple[str, List[str], str, bool]) -> Dict[str, Any]:
+    """
+    Splice current library definitions over stale embedded symbols.
+
+    Takes (schematic path, lib_ids to refresh, symbols dir, allow newer) so it
+    can run in a process pool. Symbols from a library saved by a newer KiCad
+    than the schematic may use tokens the older KiCad cannot read, so they are
+    skipped unless `allow newer` is set. The schematic's own (version ...) is
+    never changed: schematic and symbol library formats are numbered
+    separately. The file is replaced atomically.
+
+    Returns {'refreshed': [lib_id], 'skipped': [(lib_id, kicad version)],
+    'requires': newest KiCad version of a spliced library if newer than the
+    schematic's, else None}.
+    """
+    schematic_path, lib_ids, symbols_dir, allow_newer = task
+    result: Dict[str, Any] = {'refreshed': [], 'skipped': [], 'requires': None}
+    text = Path(schematic_path).read_text(encoding='utf-8')
+    root, _ = sexpr_children(text, text.index('('))
+    lib_symbols = next(((start, end) for head, start, end in root if head == 'lib_symbols'), None)
+    if lib_symbols is None:
+        return result
+    schematic_kicad = _generator_version(text, root)
+
+    libraries: Dict[str, Tuple[str, Dict[str, Tuple[int, int]], Tuple[int, ...]]] = {}
+    requires: Tuple[int, ...] = schematic_kicad
+    edits = []
+    entries, _ = sexpr_children(text, lib_symbols[0])
+    for head, start, end in entries:
+        if head != 'symbol':
+            continue
+        lib_id = _SYMBOL_NAME_RE.match(text, start).group(1)
+        if lib_id not in lib_ids:
+            continue
+        nickname, name = lib_id.split(':', 1)
+        if nickname not in libraries:
+            library_text = (Path(symbols_dir) / f"{nickname}.kicad_sym").read_text(encoding='utf-8')
+            library_root, _ = sexpr_children(library_text, library_text.index('('))
+            libraries[nickname] = (library_text, _top_level_symbols(library_text),
+                                   _generator_version(library_text, library_root))
+        library_text, spans, library_kicad = libraries[nickname]
+        if name not in spans:
+            continue
+        if library_kicad > schematic_kicad:
+            if not allow_newer:
+                result['skipped'].append((lib_id, _format_version(library_kicad)))
+                continue
+            requires = max(requires, library_kicad)
+        depth = len(text[text.rfind('\n', 0, start) + 1:start])
+        edits.append((start, end, embedded_symbol_text(library_text, spans, name, lib_id, depth), lib_id))
+
+    if not edits:
+        return result
+
+    for start, end, replacement, _ in sorted(edits, reverse=True):
+        text = text[:start] + replacement + text[end:]
+
+    with atomic_write(schematic_path) as f:
+        f.write(text)
+    result['refreshed'] = [lib_id for *_, lib_id in edits]
+    if requires > schematic_kicad:
+        result['requires'] = _format_version(requires)
+    return result
+
+
+# Bump when the extracted data changes shape, to invalidate cached results
+EXTRACT_FORMAT_VERSION = 3
+CACHE_DIR = REPO_ROOT / ".cache" / "blocks"
+OUTPUT_DIR = REPO_ROOT / "build" / "blocks"
+
+# Properties that are BOM columns of their own rather than extra fields
+STANDARD_PROPERTIES = frozenset({'Reference', 'Value', 'Footprint', 'Datasheet', 'Description'})
+MPN_PROPERTIES = ('MPN', 'Manufacturer Part Number', 'Manufacturer_Part_Number', 'MFR_PN')
+
+# Schematic coordinates are compared as integer multiples of 0.1 um
+_COORD_SCALE = 10000
+
+
+@dataclass
+class BlockComponent:
+    """A placed symbol in a block schematic."""
+    reference: str
+    value: str
+    footprint: str
+    lib_id: str
+    in_bom: bool = True
+    dnp: bool = False
+    fields: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def mpn(self) -> str:
+        return next((self.fields[k] for k in MPN_PROPERTIES if self.fields.get(k)), '')
+
+
+@dataclass
+class BlockNet:
+    """A net and the symbol pins on it, as (reference, pin number, pin name)."""
+    name: str
+    nodes: List[Tuple[str, str, str]] = field(default_factory=list)
+
+
+@dataclass
+class BlockContents:
+    """Everything extracted from one block schematic."""
+    schematic: str
+    content_hash: str
+    components: List[BlockComponent] = field(default_factory=list)
+    nets: List[BlockNet] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return Path(self.schematic).stem
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BlockContents':
+        """Create from dictionary (JSON deserialization)."""
+        return cls(
+            schematic=data['schematic'],
+            content_hash=data['content_hash'],
+            components=[BlockComponent(**c) for c in data['components']],
+            nets=[BlockNet(n['name'], [tuple(node) for node in n['nodes']]) for n in data['nets']],
+        )
+
+
+def _natural_key(text: str) -> List[Any]:
+    """Sort key that orders R2 before R10."""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', text)]
+
+
+def _point(x: str, y: str) -> Tuple[int, int]:
+    return round(float(x) * _COORD_SCALE), round(float(y) * _COORD_SCALE)
+
+
+def _library_pins(lib_symbols: List[Any]) -> Dict[str, Tuple[bool, List[PinRow]]]:
+    """
+    Collect the pins of every symbol in a lib_symbols section.
+
+    Returns {name: (is_power_symbol, pins)}, with pin positions in library
+    coordinates (Y up).
+    """
+    elements = [symbol for symbol in lib_symbols[1:] if isinstance(symbol, list) and symbol[0] == 'symbol']
+    symbols = {symbol[1]: (sexpr_field(symbol, 'power') is not None, []) for symbol in elements}
+    for name, pin in iter_symbol_pins(elements):
+        symbols[name][1].append(pin)
+    return symbols
+
+
+def _place(x: float, y: float, origin: Tuple[float, float], angle: float,
+           mirror: Optional[str]) -> Tuple[int, int]:
+    """Transform a library point (Y up) to schematic coordinates (Y down)."""
+    y = -y
+    if angle:
+        cos_a = round(math.cos(math.radians(angle)))
+        sin_a = round(math.sin(math.radians(angle)))
+        x, y = x * cos_a + y * sin_a, -x * sin_a + y * cos_a
+    if mirror == 'x':
+        y = -y
+    elif mirror == 'y':
+        x = -x
+    return (round((origin[0] + x) * _COORD_SCALE), round((origin[1] + y) * _COORD_SCALE))
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[Any, Any] = {}
+
+    def find(self, item: Any) -> Any:
+        self.parent.setdefault(item, item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: Any, b: Any) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def _on_segment(p: Tuple[int, int], a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    if (b[0] - a[0]) * (p[1] - a[1]) != (b[1] - a[1]) * (p[0] - a[0]):
+        return False
+    return min(a[0], b[0]) <= p[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= p[1] <= max(a[1], b[1])
+
+
+def extract_block(schematic_path: str, content_hash: str = '') -> BlockContents:
+    """
+    Extract components and nets from a block schematic in one streaming pass.
+
+    Each top-level element (lib_symbols, placed symbols, wires, labels,
+    junctions) is materialized on its own and reduced to components, pin
+    points and wire segments; connectivity is then resolved with union-find
+    over the points. Wire ends and pins that land on another wire connect to
+    it, same-named labels join their nets, and power symbols name their net
+    after their Value. Only a power symbol's power_in pin names a net, so a
+    PWR_FLAG (power_out) does not merge the net it flags into "PWR_FLAG";
+    pins of #PWR and #FLG references are never net nodes.
+    """
+    contents = BlockContents(schematic=schematic_path, content_hash=content_hash)
+    library: Dict[str, Tuple[bool, List[PinRow]]] = {}
+    pins: List[Tuple[Tuple[int, int], str, str, str]] = []  # (point, reference, number, name)
+    power: List[Tuple[Tuple[int, int], str]] = []
+    labels: List[Tuple[Tuple[int, int], str]] = []
+    wires: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
+    junctions: List[Tuple[int, int]] = []
+    placed = set()
+
+    heads = ('lib_symbols', 'symbol', 'wire', 'junction', 'label', 'global_label', 'hierarchical_label')
+    for element in iter_sexpr_elements(schematic_path, heads=heads):
+        head = element[0]
+        if head == 'lib_symbols':
+            library = _library_pins(element)
+        elif head == 'wire':
+            points = [_point(xy[1], xy[2]) for xy in sexpr_field(element, 'pts')[1:]]
+            wires.extend(zip(points, points[1:]))
+        elif head == 'junction':
+            at = sexpr_field(element, 'at')
+            junctions.append(_point(at[1], at[2]))
+        elif head in ('label', 'global_label', 'hierarchical_label'):
+            at = sexpr_field(element, 'at')
+            labels.append((_point(at[1], at[2]), element[1]))
+        elif head == 'symbol':
+            properties = {item[1]: item[2] for item in element[1:]
+                          if isinstance(item, list) and item[0] == 'property'}
+            lib_id = sexpr_field(element, 'lib_id')[1]
+            lib_name = sexpr_field(element, 'lib_name')
+            is_power, lib_pins = library.get(lib_name[1] if lib_name else lib_id, (False, []))
+            reference = properties.get('Reference', '')
+            at = sexpr_field(element, 'at')
+            origin = (float(at[1]), float(at[2]))
+            angle = float(at[3]) if len(at) > 3 else 0.0
+            mirror = sexpr_field(element, 'mirror')
+            unit = sexpr_field(element, 'unit')
+            unit = int(unit[1]) if unit else 1
+            for pin in lib_pins:
+                if pin.unit not in (0, unit) or pin.body_style > 1:
+                    continue
+                point = _place(pin.x, pin.y, origin, angle, mirror[1] if mirror else None)
+                if is_power:
+                    if pin.electrical_type == 'power_in':
+                        power.append((point, properties.get('Value', '')))
+                elif not reference.startswith('#'):
+                    pins.append((point, reference, pin.number, pin.name))
+
+            # Power symbols and power flags (#PWR, #FLG) are not parts;
+            # multi-unit parts appear once per unit
+            if is_power or reference.startswith('#') or reference in placed:
+                continue
+            placed.add(reference)
+            in_bom = sexpr_field(element, 'in_bom')
+            dnp = sexpr_field(element, 'dnp')
+            contents.components.append(BlockComponent(
+                reference=reference,
+                value=properties.get('Value', ''),
+                footprint=properties.get('Footprint', ''),
+                lib_id=lib_id,
+                in_bom=in_bom is None or in_bom[1] == 'yes',
+                dnp=dnp is not None and dnp[1] == 'yes',
+                fields={k: v for k, v in properties.items()
+                        if k not in STANDARD_PROPERTIES and not k.startswith('ki_') and v},
+            ))
+
+    # Resolve connectivity: points on the same wire, label name or power net are joined
+    nets = _UnionFind()
+    for a, b in wires:
+        nets.union(('point', a), ('point', b))
+    ends = [end for wire in wires for end in wire]
+    for point in [p for p, *_ in pins] + [p for p, _ in power] + [p for p, _ in labels] + junctions + ends:
+        nets.find(('point', point))
+        for a, b in wires:
+            if _on_segment(point, a, b):
+                nets.union(('point', a), ('point', point))
+    for point, name in labels:
+        nets.union(('label', name), ('point', point))
+    for point, name in power:
+        nets.union(('label', name), ('point', point))
+
+    names: Dict[Any, str] = {}
+    for kind, value in list(nets.parent):
+        if kind == 'label':
+            names.setdefault(nets.find((kind, value)), value)
+    grouped: Dict[Any, BlockNet] = {}
+    for point, reference, number, name in sorted(pins, key=lambda p: (_natural_key(p[1]), _natural_key(p[2]))):
+        root = nets.find(('point', point))
+        net = grouped.get(root)
+        if net is None:
+            net = grouped[root] = BlockNet(names.get(root) or f"Net-({reference}-Pad{number})")
+        net.nodes.append((reference, number, name))
+
+    contents.components.sort(key=lambda c: _natural_key(c.reference))
+    contents.nets = sorted(grouped.values(), key=lambda n: _natural_key(n.name))
+    return contents
+
+
+def _extract_task(task: Tuple[str, str]) -> Dict[str, Any]:
+    schematic_path, content_hash = task
+    return extract_block(schematic_path, content_hash).to_dict()
+
+
+def extract_blocks(schematics: List[Path], cache_dir: Optional[Path] = CACHE_DIR,
+                   jobs: int = 1) -> List[BlockContents]:
+    """
+    Extract every block, reusing cached results for unchanged schematics.
+
+    Results are cached as JSON under cache_dir, keyed by the SHA-256 of the
+    schematic file; pass cache_dir=None to disable the cache.
+    """
+    results: Dict[str, BlockContents] = {}
+    pending = []
+    for schematic in schematics:
+        content_hash = hashlib.sha256(schematic.read_bytes()).hexdigest()
+        cache_file = cache_dir / f"{content_hash}.v{EXTRACT_FORMAT_VERSION}.json" if cache_dir else None
+        if cache_file is not None and cache_file.exists():
+            STATS.count('cache_hits')
+            cached = BlockContents.from_dict(json.loads(cache_file.read_text()))
+            cached.schematic = str(schematic)
+            results[str(schematic)] = cached
+        else:
+            pending.append((str(schematic), content_hash))
+
+    with STATS.phase('extract'):
+        extracted = parallel_map(_extract_task, pending, jobs)
+    for data in extracted:
+        contents = BlockContents.from_dict(data)
+        results[contents.schematic] = contents
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = cache_dir / f"{contents.content_hash}.v{EXTRACT_FORMAT_VERSION}.json"
+            with atomic_write(cache_file) as f:
+                f.write(json.dumps(data))
+
+    return [results[str(schematic)] for schematic in schematics]
+
+
+def bom_rows(contents: BlockContents) -> List[Dict[str, Any]]:
+    """Group the block's components into BOM lines (one per distinct part)."""
+    extra_fields = sorted({k for c in contents.components for k in c.fields if k not in MPN_PROPERTIES})
+    groups: Dict[Tuple, List[BlockComponent]] = {}
+    for component in contents.components:
+        if not component.in_bom:
+            continue
+        key = (component.value, component.footprint, component.lib_id, component.mpn, component.dnp,
+               tuple(component.fields.get(k, '') for k in extra_fields))
+        groups.setdefault(key, []).append(component)
+
+    rows = []
+    for (value, footprint, lib_id, mpn, dnp, extras), components in groups.items():
+        references = sorted((c.reference for c in components), key=_natural_key)
+        row = {
+            'references': ' '.join(references),
+            'quantity': len(references),
+            'value': value,
+            'footprint': footprint,
+            'mpn': mpn,
+            'lib_id': lib_id,
+            'dnp': dnp,
+        }
+        row.update(zip(extra_fields, extras))
+        rows.append(row)
+    rows.sort(key=lambda r: _natural_key(r['references']))
+    return rows
+
+
+def net_rows(contents: BlockContents) -> List[Dict[str, Any]]:
+    """Summarize the block's nets, one row per net."""
+    return [
+        {
+            'net': net.name,
+            'pins': len(net.nodes),
+            'nodes': ' '.join(f"{ref}.{number}" + (f"({name})" if name and name != '~' else '')
+                              for ref, number, name in net.nodes),
+        }
+        for net in contents.nets
+    ]
+
+
+def _resolve_schematics(paths: Iterable[str]) -> List[Path]:
+    """Expand block directories / schematic paths given on the command line."""
+    schematics = []
+    for path in map(Path, paths):
+        if path.suffix == '.kicad_sch':
+            schematics.append(path)
+        else:
+            schematics.extend(sorted(path.glob('*.kicad_sch')) or find_block_schematics(path))
+    return schematics
+
+
+def cmd_check(args):
+    """Handle the 'check' command."""
+    schematics = _resolve_schematics(args.blocks) if args.blocks else find_block_schematics()
+    index = build_library_index(Path(args.symbols_dir), args.jobs)
+    reports = check_blocks(schematics, index, args.jobs)
+
+    if args.format == 'json':
+        print(json.dumps([r.to_dict() for r in reports], indent=2))
+    else:
+        for report in reports:
+            status = f"{len(report.stale)} of {report.checked} library symbols stale"
+            print(f"{report.name}: {status}")
+            for stale in report.stale:
+                if stale.status == 'missing':
+                    print(f"  MISSING {stale.lib_id} (not in library)")
+                else:
+                    print(f"  STALE   {stale.lib_id} "
+                          f"(embedded {stale.embedded_hash}, library {stale.library_hash})")
+
+    sys.exit(1 if any(r.stale for r in reports) else 0)
+
+
+def cmd_refresh(args):
+    """Handle the 'refresh' command."""
+    schematics = _resolve_schematics(args.blocks) if args.blocks else find_block_schematics()
+    index = build_library_index(Path(args.symbols_dir), args.jobs)
+    reports = check_blocks(schematics, index, args.jobs)
+
+    tasks = []
+    for report in reports:
+        lib_ids = [s.lib_id for s in report.stale if s.status == 'stale'
+                   and (not args.symbol or s.lib_id in args.symbol)]
+        for stale in report.stale:
+            if stale.status == 'missing':
+                print(f"{report.name}: {stale.lib_id} is not in the library, left as is")
+        if lib_ids:
+            tasks.append((report.schematic, lib_ids, args.symbols_dir, args.allow_newer_kicad))
+
+    with STATS.phase('refresh'):
+        results = parallel_map(refresh_block, tasks, args.jobs)
+    skipped = False
+    for (schematic, *_), result in zip(tasks, results):
+        name = Path(schematic).stem
+        for lib_id in result['refreshed']:
+            print(f"{name}: refreshed {lib_id}")
+        for lib_id, kicad in result['skipped']:
+            skipped = True
+            print(f"{name}: skipped {lib_id}, the library was saved by KiCad {kicad}, "
+                  f"newer than the block")
+        if result['requires']:
+            print(f"{name}: WARNING now needs KiCad {result['requires']} or newer to open")
+    if skipped:
+        print("Pass --allow-newer-kicad to refresh these anyway; the blocks will then need the newer KiCad")
+    if not tasks:
+        print("All embedded library symbols are up to date")
+
+
+def _write_rows(path: Path, rows: List[Dict[str, Any]], fmt: str) -> None:
+    """Write rows as CSV or JSON, replacing the file atomically."""
+    with atomic_write(path, newline='') as f:
+        if fmt == 'json':
+            json.dump(rows, f, indent=2)
+        else:
+            fieldnames = list(dict.fromkeys(k for row in rows for k in row))
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def cmd_bom(args):
+    """Handle the 'bom' command."""
+    schematics = _resolve_schematics(args.blocks) if args.blocks else find_block_schematics()
+    cache_dir = None if args.no_cache else Path(args.cache_dir)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    blocks = extract_blocks(schematics, cache_dir, args.jobs)
+    with STATS.phase('serialize'):
+        for contents in blocks:
+            bom = bom_rows(contents)
+            nets = net_rows(contents)
+            bom_path = output_dir / f"{contents.name}.bom.{args.format}"
+            nets_path = output_dir / f"{contents.name}.nets.{args.format}"
+            _write_rows(bom_path, bom, args.format)
+            _write_rows(nets_path, nets, args.format)
+            STATS.count('components', len(contents.components))
+            print(f"{contents.name}: {sum(r['quantity'] for r in bom)} parts in {len(bom)} lines, "
+                  f"{len(nets)} nets -> {bom_path.name}, {nets_path.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reference design block utilities for Nordic KiCad Library",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    add_instrumentation_arguments(parser)
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    def add_common_arguments(sub):
+        sub.add_argument('blocks', nargs='*',
+                         help='Block directories or .kicad_sch files (default: all blocks)')
+        sub.add_argument('--symbols-dir', default=str(SYMBOLS_DIR),
+                         help='Directory of .kicad_sym libraries')
+        add_jobs_argument(sub)
+
+    # Check command
+    check_parser = subparsers.add_parser('check',
+                                         help='List embedded symbols that differ from the library')
+    add_common_arguments(check_parser)
+    check_parser.add_argument('--format', '-f', choices=['text', 'json'], default='text',
+                              help='Output format')
+    check_parser.set_defaults(func=cmd_check)
+
+    # Refresh command
+    refresh_parser = subparsers.add_parser('refresh',
+                                           help='Splice library definitions over stale embedded symbols')
+    add_common_arguments(refresh_parser)
+    refresh_parser.add_argument('--symbol', '-s', action='append',
+                                help='Only refresh this lib_id (repeatable)')
+    refresh_parser.add_argument('--allow-newer-kicad', action='store_true',
+                                help='Also refresh symbols from libraries saved by a newer KiCad than the block')
+    refresh_parser.set_defaults(func=cmd_refresh)
+
+    # BOM command
+    bom_parser = subparsers.add_parser('bom', help='Write BOM and net summary for each block')
+    bom_parser.add_argument('blocks', nargs='*',
+                            help='Block directories or .kicad_sch files (default: all blocks)')
+    bom_parser.add_argument('--format', '-f', choices=['csv', 'json'], default='csv',
+                            help='Output format')
+    bom_parser.add_argument('--output-dir', '-o', default=str(OUTPUT_DIR),
+                            help='Directory for <block>.bom.* and <block>.nets.* files')
+    bom_parser.add_argument('--cache-dir', default=str(CACHE_DIR),
+                            help='Cache of extracted blocks, keyed by schematic content hash')
+    bom_parser.add_argument('--no-cache', action='store_true', help='Ignore and do not write the cache')
+    add_jobs_argument(bom_parser)
+    bom_parser.set_defaults(func=cmd_bom)
+
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    run_instrumented(args, parser)
+
+
+if __name__ == '__main__':
+    main()
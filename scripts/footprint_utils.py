@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Footprint Utilities for Nordic KiCad Library
+
+Generates ball grid array (BGA/CSP) footprints from package parameters, in
+the same format as kicad-footprint-generator's ipc_bga_generator.py. It
+enables:
+- Generating a whole family of grid array footprints in one batch run
+- Checking the generated footprints byte for byte against footprints/*.pretty
+
+Package parameters live in scripts/grid_array/<library>.yaml, one entry per
+footprint, using the keys of the generator's data/grid_array/*.yaml files
+(pitch, layout_x/y, pad_skips, offset_x/y, ...).
+
+Usage:
+    # Regenerate every grid array footprint into footprints/<library>.pretty
+    python footprint_utils.py generate
+
+    # Check one family against the committed footprints (exit code 1 on differences)
+    python footprint_utils.py generate grid_array/nordic-lib-kicad-nrf54l.yaml --check
+"""
+
+import argparse
+import difflib
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+import yaml
+
+from symbol_utils import (
+    STATS, REPO_ROOT, sexpr_quote, add_instrumentation_arguments, run_instrumented, atomic_write,
+)
+
+
+FOOTPRINTS_DIR = REPO_ROOT / "footprints"
+GRID_ARRAY_DIR = Path(__file__).resolve().parent / "grid_array"
+
+FORMAT_VERSION = 20260206
+MODEL_PATH = "${{KICAD10_3RD_PARTY}}/3dmodels/com_github_hlord2000_nordic-lib-kicad/{library}.3dshapes/{name}.step"
+
+# JEDEC ball row names: I, O, Q, S, X and Z are never used
+JEDEC_ROW_LETTERS = "ABCDEFGHJKLMNPRTUVWY"
+
+# Layout rules (KLC defaults used by ipc_bga_generator.py), in mm
+COURTYARD_OFFSET = 1.0
+COURTYARD_GRID = 0.01
+SILK_FAB_OFFSET = 0.11
+# Silkscreen is pushed out to clear the pads by at least this much (line centre)
+SILK_PAD_CLEARANCE = 0.15
+SILK_PIN1_MARKER = 0.5
+FAB_BEVEL_ABSOLUTE = 1.0
+FAB_BEVEL_RELATIVE = 0.25
+# Fab reference text size: body length along the text / 4.3, within [0.5, 1.0]
+FAB_TEXT_LENGTH_RATIO = 4.3
+FAB_TEXT_SIZE_MIN = 0.5
+FAB_TEXT_SIZE_MAX = 1.0
+FAB_TEXT_THICKNESS_RATIO = 0.15
+LINE_WIDTHS = {'F.SilkS': 0.12, 'F.Fab': 0.1, 'F.CrtYd': 0.05}
+
+
+def jedec_row_names(count: int) -> List[str]:
+    """Return the first count JEDEC row names (A, B, ... Y, AA, AB, ...)."""
+    names = list(JEDEC_ROW_LETTERS)
+    names += [a + b for a in JEDEC_ROW_LETTERS for b in JEDEC_ROW_LETTERS]
+    if count > len(names):
+        raise ValueError(f"Too many ball rows: {count}")
+    return names[:count]
+
+
+@dataclass
+class GridArrayPackage:
+    """Parameters of one grid array footprint."""
+    name: str
+    library: str
+    description: str
+    size_source: str
+    body_size_x: float
+    body_size_y: float
+    pitch_x: float
+    pitch_y: float
+    pad_diameter: float
+    layout_x: int
+    layout_y: int
+    device_type: str = "BGA"
+    row_names: List[str] = field(default_factory=list)
+    pad_skips: List[str] = field(default_factory=list)
+    offset_x: float = 0.0
+    offset_y: float = 0.0
+
+    @classmethod
+    def from_params(cls, name: str, params: Dict[str, Any], library: str) -> 'GridArrayPackage':
+        """
+        Build a package from a parameter file entry.
+
+        Keys that only matter for 3D models or mask expansion (ball_diameter,
+        overall_height, body_pcb_gap, mask_margin) are accepted and ignored.
+        """
+        pitch_x = params.get('pitch_x', params.get('pitch'))
+        pitch_y = params.get('pitch_y', params.get('pitch'))
+        if pitch_x is None or pitch_y is None:
+            raise ValueError(f"{name}: 'pitch' or 'pitch_x'/'pitch_y' is required")
+        layout_y = int(params['layout_y'])
+        return cls(
+            name=name,
+            library=library,
+            description=params['description'],
+            size_source=params['size_source'],
+            body_size_x=params['body_size_x'],
+            body_size_y=params['body_size_y'],
+            pitch_x=pitch_x,
+            pitch_y=pitch_y,
+            pad_diameter=params['pad_diameter'],
+            layout_x=int(params['layout_x']),
+            layout_y=layout_y,
+            device_type=params.get('device_type', 'BGA'),
+            row_names=[str(r) for r in params.get('row_names', jedec_row_names(layout_y))],
+            pad_skips=[str(p) for p in params.get('pad_skips', [])],
+            offset_x=params.get('offset_x', 0.0),
+            offset_y=params.get('offset_y', 0.0),
+        )
+
+    @property
+    def pitch_text(self) -> str:
+        if self.pitch_x == self.pitch_y:
+            return f"{self.pitch_x}"
+        return f"{self.pitch_x}x{self.pitch_y}"
+
+
+def load_packages(params_path: Path) -> List[GridArrayPackage]:
+    """Load every package of a parameter file; the file name is the footprint library."""
+    with open(params_path, encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    library = params_path.stem
+    return [GridArrayPackage.from_params(name, params, library)
+            for name, params in data.items() if name != 'FileHeader']
+
+
+def _to_nm(values: Any) -> np.ndarray:
+    """Round mm values to KiCad's internal nanometre units (half away from zero)."""
+    values = np.asarray(values, dtype=np.float64) * 1e6
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+def _mm(nm: int) -> str:
+    """Format a nanometre value the way KiCad writes millimetres."""
+    nm = int(nm)
+    sign = '-' if nm < 0 else ''
+    whole, frac = divmod(abs(nm), 1_000_000)
+    if not frac:
+        return f"{sign}{whole}"
+    return f"{sign}{whole}.{frac:06d}".rstrip('0')
+
+
+def outline_geometry(packages: List[GridArrayPackage], pad_extents: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute fab, silkscreen, courtyard and text geometry for a whole family at once.
+
+    pad_extents holds, per package, how far the pads reach towards -x and -y
+    (nanometres). Every returned array has one row per package; lengths are
+    in nanometres.
+    """
+    body = np.array([[p.body_size_x, p.body_size_y] for p in packages], dtype=np.float64).reshape(-1, 2)
+    chamfer = np.minimum(FAB_BEVEL_ABSOLUTE, body.min(axis=1) * FAB_BEVEL_RELATIVE)
+    fab = _to_nm(body / 2)
+    silk_outline = np.maximum(fab, pad_extents + _to_nm(SILK_PAD_CLEARANCE))
+    silk_chamfer = np.minimum(_to_nm(FAB_BEVEL_ABSOLUTE),
+                              _to_nm(silk_outline.min(axis=1) / 1e6 * 2 * FAB_BEVEL_RELATIVE))
+    courtyard_edge = fab + _to_nm(COURTYARD_OFFSET)
+    grid = int(_to_nm(COURTYARD_GRID))
+    rotated = body[:, 1] > body[:, 0]
+    text_size = np.clip(np.round(np.where(rotated, body[:, 1], body[:, 0]) / FAB_TEXT_LENGTH_RATIO, 2),
+                        FAB_TEXT_SIZE_MIN, FAB_TEXT_SIZE_MAX)
+    return {
+        'fab': fab,
+        'chamfer': _to_nm(chamfer),
+        'silk': silk_outline + _to_nm(SILK_FAB_OFFSET),
+        'silk_chamfer': silk_chamfer,
+        'courtyard_edge': courtyard_edge,
+        'courtyard': -(-courtyard_edge // grid) * grid,
+        'text_rotated': rotated,
+        'text_size': _to_nm(text_size),
+        'text_thickness': _to_nm(text_size * FAB_TEXT_THICKNESS_RATIO),
+    }
+
+
+def ball_grid(package: GridArrayPackage) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute ball names and positions (nanometres), row by row, without skipped balls.
+
+    The grid is centred on the body and then shifted by offset_x/offset_y.
+    """
+    if len(package.row_names) < package.layout_y:
+        raise ValueError(f"{package.name}: {package.layout_y} rows but only "
+                         f"{len(package.row_names)} row names")
+    columns = np.arange(package.layout_x)
+    rows = np.arange(package.layout_y)
+    x = (columns - (package.layout_x - 1) / 2) * package.pitch_x + package.offset_x
+    y = (rows - (package.layout_y - 1) / 2) * package.pitch_y + package.offset_y
+    xx, yy = np.meshgrid(x, y)
+
+    row_names = np.array(package.row_names[:package.layout_y])
+    column_names = (columns + 1).astype(str)
+    names = np.char.add(np.repeat(row_names, package.layout_x), np.tile(column_names, package.layout_y))
+
+    unknown = set(package.pad_skips) - set(names.tolist())
+    if unknown:
+        raise ValueError(f"{package.name}: pad_skips not in the grid: {', '.join(sorted(unknown))}")
+    keep = ~np.isin(names, package.pad_skips)
+    positions = _to_nm(np.column_stack([xx.ravel(), yy.ravel()]))
+    return names[keep], positions[keep]
+
+
+def _font(size: str, thickness: str, indent: str) -> List[str]:
+    return [
+        f"{indent}(effects",
+        f"{indent}\t(font",
+        f"{indent}\t\t(size {size} {size})",
+        f"{indent}\t\t(thickness {thickness})",
+        f"{indent}\t)",
+        f"{indent})",
+    ]
+
+
+def _stroke(layer: str) -> List[str]:
+    return [
+        "\t\t(stroke",
+        f"\t\t\t(width {LINE_WIDTHS[layer]})",
+        "\t\t\t(type solid)",
+        "\t\t)",
+    ]
+
+
+def _fp_line(start: Tuple[int, int], end: Tuple[int, int], layer: str) -> List[str]:
+    return [
+        "\t(fp_line",
+        f"\t\t(start {_mm(start[0])} {_mm(start[1])})",
+        f"\t\t(end {_mm(end[0])} {_mm(end[1])})",
+        *_stroke(layer),
+        f'\t\t(layer "{layer}")',
+        "\t)",
+    ]
+
+
+def footprint_text(package: GridArrayPackage, geometry: Dict[str, np.ndarray], index: int,
+                   names: np.ndarray, positions: np.ndarray) -> str:
+    """Serialize one package to .kicad_mod text, given its row of outline_geometry()."""
+    fx, fy = geometry['fab'][index]
+    sx, sy = geometry['silk'][index]
+    cx, cy = geometry['courtyard'][index]
+    ref_y = geometry['courtyard_edge'][index][1]
+    c = geometry['chamfer'][index]
+    sc = geometry['silk_chamfer'][index]
+    marker = int(_to_nm(SILK_PIN1_MARKER))
+    text_size = _mm(geometry['text_size'][index])
+    text_thickness = _mm(geometry['text_thickness'][index])
+    text_angle = -90 if geometry['text_rotated'][index] else 0
+
+    descr = (f"{package.description}, {package.body_size_x}x{package.body_size_y}mm, "
+             f"{len(names)} Ball, {package.layout_x}x{package.layout_y} Layout, "
+             f"{package.pitch_text}mm Pitch, generated with kicad-footprint-generator "
+             f"ipc_bga_generator.py, {package.size_source}")
+    tags = f"{package.device_type} {len(names)} {package.pitch_text}"
+
+    lines = [
+        f"(footprint {sexpr_quote(package.name)}",
+        f"\t(version {FORMAT_VERSION})",
+        '\t(generator "kicad-footprint-generator")',
+        '\t(layer "F.Cu")',
+        f"\t(descr {sexpr_quote(descr)})",
+        f"\t(tags {sexpr_quote(tags)})",
+        '\t(property "Reference" "REF**"',
+        f"\t\t(at 0 {_mm(-ref_y)} 0)",
+        '\t\t(layer "F.SilkS")',
+        *_font('1', '0.15', '\t\t'),
+        "\t)",
+        f"\t(property \"Value\" {sexpr_quote(package.name)}",
+        f"\t\t(at 0 {_mm(ref_y)} 0)",
+        '\t\t(layer "F.Fab")',
+        *_font('1', '0.15', '\t\t'),
+        "\t)",
+        "\t(attr smd)",
+        "\t(duplicate_pad_numbers_are_jumpers no)",
+        # Silkscreen: body (or pad field) outline plus silk_fab_offset, open at the pin 1 corner
+        *_fp_line((-sx, sy), (-sx, -(sy - sc)), 'F.SilkS'),
+        *_fp_line((-(sx - sc), -sy), (sx, -sy), 'F.SilkS'),
+        *_fp_line((sx, -sy), (sx, sy), 'F.SilkS'),
+        *_fp_line((sx, sy), (-sx, sy), 'F.SilkS'),
+        "\t(fp_poly",
+        "\t\t(pts",
+        f"\t\t\t(xy {_mm(-sx)} {_mm(-sy)})",
+        f"\t\t\t(xy {_mm(-sx - marker)} {_mm(-sy)})",
+        f"\t\t\t(xy {_mm(-sx)} {_mm(-sy - marker)})",
+        "\t\t)",
+        *_stroke('F.SilkS'),
+        "\t\t(fill yes)",
+        '\t\t(layer "F.SilkS")',
+        "\t)",
+        "\t(fp_rect",
+        f"\t\t(start {_mm(-cx)} {_mm(-cy)})",
+        f"\t\t(end {_mm(cx)} {_mm(cy)})",
+        *_stroke('F.CrtYd'),
+        "\t\t(fill no)",
+        '\t\t(layer "F.CrtYd")',
+        "\t)",
+        # Fabrication: body outline with the pin 1 corner bevelled
+        *_fp_line((-fx, -fy + c), (-fx + c, -fy), 'F.Fab'),
+        *_fp_line((-fx, fy), (-fx, -fy + c), 'F.Fab'),
+        *_fp_line((-fx + c, -fy), (fx, -fy), 'F.Fab'),
+        *_fp_line((fx, -fy), (fx, fy), 'F.Fab'),
+        *_fp_line((fx, fy), (-fx, fy), 'F.Fab'),
+        '\t(fp_text user "${REFERENCE}"',
+        f"\t\t(at 0 0 {text_angle})",
+        '\t\t(layer "F.Fab")',
+        *_font(text_size, text_thickness, '\t\t'),
+        "\t)",
+    ]
+
+    size = _mm(_to_nm(package.pad_diameter))
+    for name, (x, y) in zip(names.tolist(), positions.tolist()):
+        lines += [
+            f"\t(pad {sexpr_quote(name)} smd circle",
+            f"\t\t(at {_mm(x)} {_mm(y)})",
+            f"\t\t(size {size} {size})",
+            "\t\t(property pad_prop_bga)",
+            '\t\t(layers "F.Cu" "F.Mask" "F.Paste")',
+            "\t)",
+        ]
+
+    lines += [
+        "\t(embedded_fonts no)",
+        f"\t(model {sexpr_quote(MODEL_PATH.format(library=package.library, name=package.name))}",
+        "\t\t(offset",
+        "\t\t\t(xyz 0 0 0)",
+        "\t\t)",
+        "\t\t(scale",
+        "\t\t\t(xyz 1 1 1)",
+        "\t\t)",
+        "\t\t(rotate",
+        "\t\t\t(xyz 0 0 0)",
+        "\t\t)",
+        "\t)",
+        ")",
+        "",
+    ]
+    return '\n'.join(lines)
+
+
+def generate_footprints(packages: List[GridArrayPackage]) -> List[str]:
+    """Generate the .kicad_mod text of every package, computing outlines for the family in one pass."""
+    with STATS.phase('layout'):
+        grids = [ball_grid(package) for package in packages]
+        pad_extents = np.array([-positions.min(axis=0) + int(_to_nm(package.pad_diameter / 2))
+                                for package, (_, positions) in zip(packages, grids)]).reshape(-1, 2)
+        geometry = outline_geometry(packages, pad_extents)
+    with STATS.phase('serialize'):
+        texts = [footprint_text(package, geometry, i, names, positions)
+                 for i, (package, (names, positions)) in enumerate(zip(packages, grids))]
+    STATS.count('footprints', len(packages))
+    STATS.count('pads', sum(len(names) for names, _ in grids))
+    return texts
+
+
+def footprint_path(package: GridArrayPackage, footprints_dir: Path = FOOTPRINTS_DIR) -> Path:
+    return footprints_dir / f"{package.library}.pretty" / f"{package.name}.kicad_mod"
+
+
+def cmd_generate(args):
+    """Handle the 'generate' command."""
+    params_files = [Path(p) for p in args.params] or sorted(GRID_ARRAY_DIR.glob('*.yaml'))
+    footprints_dir = Path(args.output_dir)
+
+    with STATS.phase('parse'):
+        packages = [package for path in params_files for package in load_packages(path)]
+    if args.name:
+        packages = [p for p in packages if p.name in args.name]
+    if not packages:
+        print("No packages found", file=sys.stderr)
+        sys.exit(1)
+
+    texts = generate_footprints(packages)
+
+    failed = 0
+    for package, text in zip(packages, texts):
+        path = footprint_path(package, footprints_dir)
+        label = f"{package.library}:{package.name}"
+        if args.check:
+            if not path.exists():
+                print(f"MISSING  {label}")
+                failed += 1
+                continue
+            existing = path.read_bytes()
+            if existing == text.encode('utf-8'):
+                print(f"OK       {label}")
+                continue
+            failed += 1
+            print(f"DIFFERS  {label}")
+            diff = difflib.unified_diff(existing.decode('utf-8').splitlines(), text.splitlines(),
+                                        str(path), 'generated', n=1, lineterm='')
+            for line in list(diff)[:args.diff_lines]:
+                print(f"    {line}")
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(path) as f:
+                f.write(text)
+            print(f"Wrote {path}")
+
+    if args.check:
+        print(f"{len(packages) - failed} of {len(packages)} footprints match")
+        sys.exit(1 if failed else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Footprint utilities for Nordic KiCad Library",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    add_instrumentation_arguments(parser)
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    # Generate command
+    gen_parser = subparsers.add_parser('generate', help='Generate grid array (BGA/CSP) footprints')
+    gen_parser.add_argument('params', nargs='*',
+                            help='Package parameter YAML files (default: grid_array/*.yaml)')
+    gen_parser.add_argument('--name', '-n', action='append',
+                            help='Only generate this footprint (repeatable)')
+    gen_parser.add_argument('--output-dir', '-o', default=str(FOOTPRINTS_DIR),
+                            help='Directory holding the <library>.pretty directories')
+    gen_parser.add_argument('--check', action='store_true',
+                            help='Compare with the existing footprints instead of writing them')
+    gen_parser.add_argument('--diff-lines', type=int, default=20,
+                            help='Diff lines to show per differing footprint with --check')
+    gen_parser.set_defaults(func=cmd_generate)
+
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    run_instrumented(args, parser)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Symbol Geometry Checks for Nordic KiCad Library
+
+SymbolGenerator keeps the symbols it creates on the 100 mil grid, but the
+hand-drawn symbols in symbols/ are only covered by the external KLC run. This
+module loads the pins of every symbol in every library into NumPy arrays and
+checks them all at once:
+- off-grid: pin connection point not on the grid (KLC S4.1)
+- overlap: two visible pins at the same connection point
+- unstacked: hidden pin that is not stacked on a visible pin
+- inside-body: pin connection point inside the body rectangle
+- length: pin length differs from the length most pins of the symbol use
+
+Hidden no_connect pins may sit anywhere, including inside the body (KLC S4.6),
+so they are exempt from the unstacked and inside-body checks.
+
+Issues listed in geometry_baseline.json already exist in the tree; they are
+reported as known and only new issues fail the check.
+
+Usage:
+    # Check every library (exit code 1 on any issue)
+    python geometry_utils.py check
+
+    # Check one library, as JSON
+    python geometry_utils.py check symbols/nordic-lib-kicad-nrf52.kicad_sym --format json
+
+    # Accept the current issues as known
+    python geometry_utils.py check --update-baseline
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Iterator, Set
+
+import numpy as np
+
+from symbol_utils import (
+    STATS, REPO_ROOT, GRID_SIZE, ELECTRICAL_TYPES, PinTable, iter_sexpr_elements,
+    iter_symbol_pins, unit_suffix,
+    add_instrumentation_arguments, run_instrumented,
+)
+
+
+SYMBOLS_DIR = REPO_ROOT / "symbols"
+BASELINE_FILE = Path(__file__).resolve().parent / "geometry_baseline.json"
+
+# Schematic coordinates are stored with 0.1 um resolution; comparing them as
+# integers of this unit avoids float rounding in the grid and stacking checks
+COORD_UNITS_PER_MM = 10000
+
+CHECKS = ('off-grid', 'overlap', 'unstacked', 'inside-body', 'length')
+
+
+@dataclass
+class GeometryIssue:
+    """One pin that fails a geometry check."""
+    check: str
+    library: str
+    symbol: str
+    unit: int
+    number: str
+    name: str
+    x: float
+    y: float
+    detail: str = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+    @property
+    def key(self) -> Tuple[str, str, str, int, str]:
+        """Identity of the issue in the baseline, independent of pin position."""
+        return (self.check, self.library, self.symbol, self.unit, self.number)
+
+
+@dataclass
+class PinArrays:
+    """
+    Pins of all checked symbols as flat arrays.
+
+    Each pin appears once per unit/body style combination it is drawn in
+    (pins of unit 0 or body style 0 are shared by every unit or style), so
+    the stacking checks only compare pins that are visible together.
+    `pin` maps each row back to its index in `table`.
+    """
+    table: PinTable
+    libraries: List[str]
+    symbols: List[Tuple[int, str]]   # (library index, symbol name)
+    pin_symbol: np.ndarray           # symbol index, per pin in table
+    pin_unit: np.ndarray             # unit number, per pin in table
+    pin: np.ndarray                  # table index, per row
+    group: np.ndarray                # unit/body style group, per row
+    group_body: np.ndarray           # body rectangle (x0, y0, x1, y1) per group, NaN if none
+
+
+def _rectangle(item: List[Any]) -> Tuple[float, float, float, float]:
+    points = {child[0]: (float(child[1]), float(child[2]))
+              for child in item[1:] if isinstance(child, list) and child[0] in ('start', 'end')}
+    (x0, y0), (x1, y1) = points['start'], points['end']
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def _record_symbols(elements: Iterator[List[Any]], library_index: int,
+                    symbols: List[Tuple[int, str]],
+                    rectangles: List[Dict[Tuple[int, int], List[Tuple[float, float, float, float]]]]
+                    ) -> Iterator[List[Any]]:
+    """Pass symbol elements through, recording each symbol and the rectangles of its units."""
+    for element in elements:
+        STATS.count('symbols')
+        units: Dict[Tuple[int, int], List[Tuple[float, float, float, float]]] = {}
+        for unit in element[2:]:
+            if isinstance(unit, list) and unit[0] == 'symbol':
+                units.setdefault(unit_suffix(unit[1]), []).extend(
+                    _rectangle(item) for item in unit[2:]
+                    if isinstance(item, list) and item[0] == 'rectangle')
+        symbols.append((library_index, element[1]))
+        rectangles.append(units)
+        yield element
+
+
+def load_pin_arrays(library_paths: List[Path]) -> PinArrays:
+    """Stream every library and collect pins and body rectangles into arrays."""
+    table = PinTable()
+    libraries = [path.stem for path in library_paths]
+    symbols: List[Tuple[int, str]] = []
+    rectangles: List[Dict[Tuple[int, int], List[Tuple[float, float, float, float]]]] = []
+    pin_symbol: List[int] = []
+
+    for library_index, path in enumerate(library_paths):
+        elements = STATS.timed_iter('parse', iter_sexpr_elements(str(path), heads=('symbol',)))
+        for _ in iter_symbol_pins(_record_symbols(elements, library_index, symbols, rectangles), table):
+            pin_symbol.append(len(symbols) - 1)
+
+    pin_symbol = np.array(pin_symbol, dtype=np.intp)
+    pin_unit = np.frombuffer(table.units, dtype=np.uint16).astype(np.intp)
+    pin_style = np.frombuffer(table.body_styles, dtype=np.uint8).astype(np.intp)
+    starts = np.searchsorted(pin_symbol, np.arange(len(symbols)), side='left')
+    ends = np.searchsorted(pin_symbol, np.arange(len(symbols)), side='right')
+    rows: List[np.ndarray] = []
+    groups: List[Tuple[int, int]] = []    # (group index, pin count) per row range
+    bodies: List[Tuple[float, float, float, float]] = []
+    for symbol_index, units in enumerate(rectangles):
+        start, end = starts[symbol_index], ends[symbol_index]
+        concrete_units = sorted({u for u, _ in units if u > 0}) or [0]
+        concrete_styles = sorted({s for _, s in units if s > 0}) or [0]
+        for cu in concrete_units:
+            for cs in concrete_styles:
+                group_rects = [r for (u, s), rects in units.items()
+                               if u in (0, cu) and s in (0, cs) for r in rects]
+                group_index = len(bodies)
+                # The body is the largest rectangle drawn in the unit
+                bodies.append(max(group_rects, key=lambda r: (r[2] - r[0]) * (r[3] - r[1]))
+                              if group_rects else (np.nan,) * 4)
+                members = start + np.flatnonzero(np.isin(pin_unit[start:end], (0, cu))
+                                                 & np.isin(pin_style[start:end], (0, cs)))
+                rows.append(members)
+                groups.append((group_index, len(members)))
+
+    pin = np.concatenate(rows) if rows else np.zeros(0, dtype=np.intp)
+    group = np.repeat([g for g, _ in groups], [n for _, n in groups]).astype(np.intp)
+    return PinArrays(
+        table=table,
+        libraries=libraries,
+        symbols=symbols,
+        pin_symbol=pin_symbol,
+        pin_unit=pin_unit,
+        pin=pin,
+        group=group,
+        group_body=np.array(bodies, dtype=np.float64).reshape(-1, 4),
+    )
+
+
+def check_geometry(arrays: PinArrays, grid: float = GRID_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Run every check over all pins at once.
+
+    Returns {check: sorted table indices of the pins that fail it}.
+    """
+    table = arrays.table
+    x = np.frombuffer(table.x, dtype=np.float64)
+    y = np.frombuffer(table.y, dtype=np.float64)
+    length = np.frombuffer(table.length, dtype=np.float64)
+    hidden = np.frombuffer(bytes(table.hidden), dtype=np.uint8).astype(bool)
+    electrical_types = np.frombuffer(table.electrical_types, dtype=np.uint8)
+    if not len(x):
+        return {check: np.zeros(0, dtype=np.intp) for check in CHECKS}
+
+    xi = np.rint(x * COORD_UNITS_PER_MM).astype(np.int64)
+    yi = np.rint(y * COORD_UNITS_PER_MM).astype(np.int64)
+    li = np.rint(length * COORD_UNITS_PER_MM).astype(np.int64)
+    grid_units = int(round(grid * COORD_UNITS_PER_MM))
+    results = {}
+
+    results['off-grid'] = np.flatnonzero((xi % grid_units != 0) | (yi % grid_units != 0))
+
+    # Connection points within a unit/body style group, as dense ids
+    pin, group = arrays.pin, arrays.group
+    _, point = np.unique(np.stack([group, xi[pin], yi[pin]], axis=1), axis=0, return_inverse=True)
+    point = point.ravel()
+    row_visible = ~hidden[pin]
+    visible_at_point = np.bincount(point, weights=row_visible, minlength=point.max() + 1)
+    results['overlap'] = np.unique(pin[row_visible & (visible_at_point[point] > 1)])
+    exempt = hidden & (electrical_types == ELECTRICAL_TYPES.code('no_connect'))
+    row_exempt = exempt[pin]
+    results['unstacked'] = np.unique(pin[~row_visible & ~row_exempt & (visible_at_point[point] == 0)])
+
+    body = arrays.group_body[group]
+    px, py = x[pin], y[pin]
+    with np.errstate(invalid='ignore'):
+        inside = (px > body[:, 0]) & (px < body[:, 2]) & (py > body[:, 1]) & (py < body[:, 3])
+    results['inside-body'] = np.unique(pin[inside & ~row_exempt])
+
+    # Most common length per symbol (the shortest on ties)
+    symbol = arrays.pin_symbol
+    pairs, counts = np.unique(np.stack([symbol, li], axis=1), axis=0, return_counts=True)
+    order = np.lexsort((pairs[:, 1], -counts, pairs[:, 0]))
+    first = order[np.r_[True, pairs[order[1:], 0] != pairs[order[:-1], 0]]]
+    usual = np.zeros(len(arrays.symbols), dtype=np.int64)
+    usual[pairs[first, 0]] = pairs[first, 1]
+    results['length'] = np.flatnonzero(li != usual[symbol])
+
+    for check, pins in results.items():
+        STATS.count(f"issues_{check.replace('-', '_')}", len(pins))
+    return results
+
+
+def describe_issues(arrays: PinArrays, results: Dict[str, np.ndarray],
+                    grid: float = GRID_SIZE) -> List[GeometryIssue]:
+    """Turn the flagged pin indices into issues, ordered by library, symbol and pin."""
+    table = arrays.table
+    usual_length: Dict[int, float] = {}
+    if len(results.get('length', ())):
+        lengths = np.frombuffer(table.length, dtype=np.float64)
+        symbols, values = arrays.pin_symbol, np.round(lengths, 4)
+        for s in np.unique(symbols[results['length']]):
+            candidates, counts = np.unique(values[symbols == s], return_counts=True)
+            usual_length[int(s)] = float(candidates[np.argmax(counts)])
+
+    issues = []
+    for check, pins in results.items():
+        for index in pins.tolist():
+            library_index, symbol = arrays.symbols[arrays.pin_symbol[index]]
+            row = table[index]
+            if check == 'off-grid':
+                detail = f"not on the {grid:g} mm grid"
+            elif check == 'overlap':
+                detail = "another visible pin at the same point"
+            elif check == 'unstacked':
+                detail = "hidden pin with no visible pin at the same point"
+            elif check == 'inside-body':
+                detail = "connection point inside the body rectangle"
+            else:
+                detail = (f"length {row.length:g} mm, most pins use "
+                          f"{usual_length[int(arrays.pin_symbol[index])]:g} mm")
+            issues.append(GeometryIssue(check, arrays.libraries[library_index], symbol,
+                                        int(arrays.pin_unit[index]), row.number, row.name,
+                                        row.x, row.y, detail))
+    order = {check: i for i, check in enumerate(CHECKS)}
+    issues.sort(key=lambda i: (i.library, i.symbol, order[i.check], i.unit, i.number))
+    return issues
+
+
+BASELINE_FIELDS = ('check', 'library', 'symbol', 'unit', 'number')
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Set[Tuple[str, str, str, int, str]]:
+    """Keys of the known issues in a baseline file (empty if it does not exist)."""
+    if not path.exists():
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {tuple(entry[field] for field in BASELINE_FIELDS) for entry in json.load(f)}
+
+
+def write_baseline(keys: Set[Tuple[str, str, str, int, str]], path: Path = BASELINE_FILE) -> None:
+    """Write issue keys as a baseline file, sorted so diffs stay small."""
+    lines = [json.dumps(dict(zip(BASELINE_FIELDS, key))) for key in sorted(keys)]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n' + ',\n'.join(lines) + '\n]\n')
+
+
+def _resolve_libraries(paths: List[str]) -> List[Path]:
+    libraries = []
+    for path in map(Path, paths):
+        libraries.extend(sorted(path.glob('*.kicad_sym')) if path.is_dir() else [path])
+    return libraries
+
+
+def cmd_check(args):
+    """Handle the 'check' command."""
+    libraries = _resolve_libraries(args.libraries or [str(SYMBOLS_DIR)])
+    arrays = load_pin_arrays(libraries)
+    with STATS.phase('check'):
+        results = check_geometry(arrays, args.grid)
+    for check in args.ignore or []:
+        results.pop(check, None)
+    issues = describe_issues(arrays, results, args.grid)
+
+    # Only baseline entries for the libraries and checks that ran can be judged
+    checked = set(arrays.libraries)
+    baseline = set() if args.no_baseline else load_baseline(args.baseline)
+    in_scope = {key for key in baseline if key[1] in checked and key[0] in results}
+    if args.update_baseline:
+        write_baseline((baseline - in_scope) | {issue.key for issue in issues}, args.baseline)
+        print(f"Wrote {len(issues)} known issues for {len(libraries)} libraries to {args.baseline}")
+        sys.exit(0)
+    found = {issue.key for issue in issues}
+    known = sum(1 for issue in issues if issue.key in in_scope)
+    fixed = len(in_scope - found)
+    issues = [issue for issue in issues if issue.key not in in_scope]
+
+    if args.format == 'json':
+        print(json.dumps([i.to_dict() for i in issues], indent=2))
+    else:
+        current = None
+        for issue in issues:
+            if (issue.library, issue.symbol) != current:
+                current = (issue.library, issue.symbol)
+                print(f"{issue.library}:{issue.symbol}")
+            print(f"  {issue.check:<12} unit {issue.unit} pin {issue.number} ({issue.name}) "
+                  f"at ({issue.x:g}, {issue.y:g}): {issue.detail}")
+        print(f"{len(issues)} issues in {len(arrays.symbols)} symbols "
+              f"({len(arrays.table)} pins, {len(libraries)} libraries)"
+              + (f", {known} known from the baseline" if known else ''))
+        if fixed:
+            print(f"{fixed} baseline issues no longer occur; run with --update-baseline to drop them")
+
+    sys.exit(1 if issues else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Symbol geometry checks for Nordic KiCad Library",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    add_instrumentation_arguments(parser)
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    # Check command
+    check_parser = subparsers.add_parser('check', help='Check pin geometry of every symbol')
+    check_parser.add_argument('libraries', nargs='*',
+                              help='.kicad_sym files or directories (default: symbols/)')
+    check_parser.add_argument('--grid', type=float, default=GRID_SIZE,
+                              help='Pin grid in mm (default: 2.54)')
+    check_parser.add_argument('--ignore', action='append', choices=CHECKS,
+                              help='Skip a check (repeatable)')
+    check_parser.add_argument('--format', '-f', choices=['text', 'json'], default='text',
+                              help='Output format')
+    check_parser.add_argument('--baseline', type=Path, default=BASELINE_FILE,
+                              help='Known issues that do not fail the check '
+                                   '(default: scripts/geometry_baseline.json)')
+    check_parser.add_argument('--no-baseline', action='store_true',
+                              help='Report every issue, including known ones')
+    check_parser.add_argument('--update-baseline', action='store_true',
+                              help='Record the current issues of the checked libraries as known')
+    check_parser.set_defaults(func=cmd_check)
+
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    run_instrumented(args, parser)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+Library Load-Time Tracking for Nordic KiCad Library
+
+Measures what the symbol libraries cost tooling that loads them with
+kiutils' SymbolLib.from_file, and how that cost develops across releases:
+- Generating synthetic libraries at 10x, 100x and 1000x today's symbol and
+  pin counts with SymbolGenerator
+- Recording parse time, peak RSS and per-symbol lookup latency of every
+  library at every git tag (and of the synthetic corpora) in a history file
+- Reporting the trend as a table and an SVG chart, failing when load cost
+  grows faster than library content
+- Comparing the memory held by extracted pins as a PinTable with the same
+  pins as PinDefinition objects
+
+Usage:
+    # Write build/corpus/x10, x100 and x1000
+    python loadtime_utils.py corpus
+
+    # Measure every library at every tag and at HEAD, plus the corpora
+    python loadtime_utils.py record --corpus
+
+    # Print the trend, write build/loadtime/trend.svg, exit 1 on a regression
+    python loadtime_utils.py report
+
+    # Memory and build time of the pins as a PinTable vs PinDefinition objects
+    python loadtime_utils.py pins
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from importlib import metadata
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+from kiutils.symbol import SymbolLib
+
+from symbol_utils import (
+    STATS, PinDefinition, PinTable, SymbolDefinition, SymbolGenerator, SymbolParser,
+    REPO_ROOT, iter_sexpr_elements, iter_symbol_pins, add_instrumentation_arguments,
+    run_instrumented, atomic_write, git, git_show,
+)
+from render_utils import SvgCanvas
+
+
+SYMBOLS_DIR = REPO_ROOT / "symbols"
+CORPUS_DIR = REPO_ROOT / "build" / "corpus"
+OUTPUT_DIR = REPO_ROOT / "build" / "loadtime"
+HISTORY_PATH = OUTPUT_DIR / "history.jsonl"
+
+# Bump when the synthetic symbols change shape, to force the corpora to be rewritten
+CORPUS_VERSION = 1
+CORPUS_SCALES = (10, 100, 1000)
+NAME_PLACEHOLDER = '@@NAME@@'
+
+# Each cost is compared with the content it should be proportional to
+COST_METRICS = (
+    # (cost field, content field, chart title, chart unit, scale to chart unit)
+    ('parse_s', 'bytes', 'Parse time', 'ms per MB', 1e3 * 1e6),
+    ('held_kb', 'bytes', 'Memory held by the loaded library', 'MB per MB', 1e3 / 1024),
+    ('lookup_us', 'symbols', 'Lookup by name', 'us per 100 symbols', 100),
+)
+LINE_COLORS = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+               '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf')
+
+
+@dataclass
+class SymbolProfile:
+    """Pin counts of one library symbol, reproduced by the synthetic symbols."""
+    visible: int
+    hidden: int
+    alternates: int
+
+
+@dataclass
+class LoadRecord:
+    """One measurement of one library at one revision."""
+    env: str
+    label: str                  # tag, 'git describe' of HEAD, or 'x<scale>'
+    commit: str
+    date: str                   # commit date, ISO 8601
+    library: str
+    scale: int                  # 1 for the real library
+    bytes: int
+    symbols: int
+    pins: int
+    parse_s: float              # best of the repeats
+    peak_rss_kb: int            # whole process, including the interpreter
+    held_kb: int                # Python allocations held by the loaded library
+    lookup_us: float            # mean SymbolParser.get_symbol time over all symbols
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+
+def environment() -> str:
+    """Identify the machine and toolchain; timings are only compared within one."""
+    try:
+        kiutils_version = metadata.version('kiutils')
+    except metadata.PackageNotFoundError:
+        kiutils_version = 'unknown'
+    return (f"{platform.node()} {platform.machine()} "
+            f"python {platform.python_version()} kiutils {kiutils_version}")
+
+
+# -- corpus -----------------------------------------------------------------
+
+def library_profile(path: Path) -> List[SymbolProfile]:
+    """Pin counts of every symbol in a library, streamed from the file."""
+    profile = []
+    for element in iter_sexpr_elements(str(path), heads=('symbol',)):
+        table = PinTable()
+        for _ in iter_symbol_pins([element], table):
+            pass
+        hidden = sum(table.hidden)
+        profile.append(SymbolProfile(len(table) - hidden, hidden, len(table.alt_names)))
+    return profile
+
+
+def _synthetic_definition(profile: SymbolProfile) -> SymbolDefinition:
+    """A symbol with the same visible, hidden and alternate counts as the profile."""
+    visible = [PinDefinition(str(i + 1), f"P{i + 1}") for i in range(profile.visible)]
+    for i in range(profile.alternates):
+        pin = visible[i % len(visible)] if visible else None
+        if pin is not None:
+            pin.alternates.append({'name': f"ALT{i}", 'electrical_type': 'bidirectional',
+                                   'graphical_style': 'line'})
+    hidden = [PinDefinition(str(profile.visible + i + 1), "VSS", 'passive', hidden=True)
+              for i in range(profile.hidden)]
+    half = (len(visible) + 1) // 2
+    return SymbolDefinition(
+        name=NAME_PLACEHOLDER,
+        description="Synthetic load-time benchmark symbol",
+        left_pins=visible[:half] + hidden,
+        right_pins=visible[half:],
+    )
+
+
+def write_corpus(profiles: Dict[str, List[SymbolProfile]], scale: int, output_dir: Path) -> List[Path]:
+    """
+    Write one synthetic library per source library with `scale` times its symbols.
+
+    Each distinct symbol shape is built and serialized once by SymbolGenerator;
+    the copies only differ in name, so they are stamped out from that text.
+    """
+    generator = SymbolGenerator()
+    templates: Dict[Tuple[int, int, int], str] = {}
+    header = generator.create_library([]).to_sexpr().rstrip()[:-1].rstrip() + '\n'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for library, profile in profiles.items():
+        path = output_dir / f"{library}.kicad_sym"
+        with STATS.phase('serialize'), atomic_write(path) as f:
+            f.write(header)
+            for copy in range(scale):
+                for index, symbol in enumerate(profile):
+                    key = (symbol.visible, symbol.hidden, symbol.alternates)
+                    if key not in templates:
+                        templates[key] = generator.create_symbol(_synthetic_definition(symbol)).to_sexpr(indent=2)
+                    f.write(templates[key].replace(NAME_PLACEHOLDER, f"SYN-{copy:04d}-{index:03d}"))
+                    STATS.count('symbols')
+            f.write(')\n')
+        written.append(path)
+    return written
+
+
+def cmd_corpus(args):
+    """Handle the 'corpus' command."""
+    libraries = sorted(Path(args.symbols_dir).glob('*.kicad_sym'))
+    with STATS.phase('parse'):
+        profiles = {path.stem: library_profile(path) for path in libraries}
+    digest = hashlib.sha256(json.dumps(
+        [CORPUS_VERSION, {name: [asdict(p) for p in profile] for name, profile in profiles.items()}],
+        sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    symbols = sum(len(p) for p in profiles.values())
+    pins = sum(s.visible + s.hidden for p in profiles.values() for s in p)
+
+    for scale in args.scales:
+        scale_dir = Path(args.output_dir) / f"x{scale}"
+        manifest = scale_dir / 'manifest.json'
+        try:
+            current = json.loads(manifest.read_text()).get('digest')
+        except (OSError, ValueError):
+            current = None
+        if current == digest and not args.force:
+            STATS.count('cache_hits')
+            print(f"x{scale}: up to date")
+            continue
+        written = write_corpus(profiles, scale, scale_dir)
+        size = sum(path.stat().st_size for path in written)
+        manifest.write_text(json.dumps({'digest': digest, 'scale': scale, 'symbols': symbols * scale,
+                                        'pins': pins * scale, 'bytes': size}, indent=2))
+        print(f"x{scale}: {symbols * scale} symbols, {pins * scale} pins, "
+              f"{size / 1e6:.1f} MB in {scale_dir}")
+
+
+# -- measurement ----------------------------------------------------------------
+
+def _peak_rss_kb() -> int:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure_library(path: Path, repeat: int) -> Dict[str, Any]:
+    """
+    Measure loading one library in this process.
+
+    Run it in a fresh interpreter (see measure_in_subprocess) so the peak RSS
+    belongs to this library alone. Peak RSS moves in allocator-sized steps, so
+    the memory held by the library is also taken from tracemalloc, in a final
+    parse that is not timed.
+    """
+    timings = []
+    library = None
+    peak = 0
+    for i in range(repeat):
+        library = None
+        gc.collect()
+        start = time.perf_counter()
+        library = SymbolLib.from_file(str(path))
+        timings.append(time.perf_counter() - start)
+        if i == 0:
+            peak = _peak_rss_kb()
+
+    parser = SymbolParser(str(path))
+    parser.library = library
+    names = [symbol.entryName for symbol in library.symbols]
+    start = time.perf_counter()
+    for name in names:
+        parser.get_symbol(name)
+    lookup = (time.perf_counter() - start) / len(names) if names else 0.0
+
+    library = parser.library = None
+    gc.collect()
+    tracemalloc.start()
+    library = SymbolLib.from_file(str(path))
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'bytes': path.stat().st_size,
+        'symbols': len(library.symbols),
+        'pins': sum(len(unit.pins) for symbol in library.symbols for unit in symbol.units),
+        'parse_s': min(timings),
+        'peak_rss_kb': peak,
+        'held_kb': held // 1024,
+        'lookup_us': lookup * 1e6,
+    }
+
+
+def measure_in_subprocess(path: Path, repeat: int) -> Dict[str, Any]:
+    result = subprocess.run([sys.executable, str(Path(__file__).resolve()), 'measure', str(path),
+                             '--repeat', str(repeat)], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"measuring {path} failed: {result.stderr.strip()}")
+    return json.loads(result.stdout)
+
+
+def measure_pin_storage(path: Path, repeat: int) -> Dict[str, Any]:
+    """
+    Compare the memory and build time of a library's pins held as one
+    PinTable with the same pins held as a list of PinDefinition objects.
+
+    Both are filled from the same streaming pass. The memory is what
+    tracemalloc still sees allocated after a final, untimed pass, so tokenizer
+    garbage is not counted. The table also holds position, unit and body
+    style, which PinDefinition has no fields for.
+    """
+    parser = SymbolParser(str(path))
+
+    def build_table():
+        table = PinTable()
+        for _ in parser.iter_library_pins(table):
+            pass
+        return table
+
+    def build_objects():
+        return [PinDefinition(**pin.to_dict()) for _, pin in parser.iter_library_pins()]
+
+    result: Dict[str, Any] = {'bytes': path.stat().st_size}
+    for label, build in (('table', build_table), ('objects', build_objects)):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pins = build()
+            timings.append(time.perf_counter() - start)
+            pins = None
+        gc.collect()
+        tracemalloc.start()
+        pins = build()
+        gc.collect()
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['pins'] = len(pins)
+        result[f'{label}_kb'] = held / 1024
+        result[f'{label}_ms'] = min(timings) * 1e3
+        pins = None
+    return result
+
+
+def cmd_measure(args):
+    """Handle the 'measure' command (one library, JSON on stdout)."""
+    print(json.dumps(measure_library(Path(args.library), args.repeat)))
+
+
+# -- history ----------------------------------------------------------------
+
+def load_history(path: Path) -> List[LoadRecord]:
+    if not path.exists():
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [LoadRecord(**json.loads(line)) for line in f if line.strip()]
+
+
+def save_history(path: Path, records: List[LoadRecord]) -> None:
+    """Rewrite the history atomically, so an interrupted run keeps what it measured."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as f:
+        for record in records:
+            f.write(json.dumps(record.to_dict(), sort_keys=True) + '\n')
+
+
+def release_revisions() -> List[Tuple[str, str]]:
+    """(label, revision) for every tag, oldest first, followed by HEAD if it is untagged."""
+    tags = git('tag', '--sort=creatordate').split()
+    revisions = [(tag, tag) for tag in tags]
+    head = git('rev-parse', 'HEAD')
+    if not tags or git('rev-parse', f"{tags[-1]}^{{commit}}") != head:
+        revisions.append((git('describe', '--tags', '--always', 'HEAD'), 'HEAD'))
+    return revisions
+
+
+def cmd_record(args):
+    """Handle the 'record' command."""
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    env = environment()
+    known = {(r.env, r.commit, r.library, r.scale) for r in history}
+    revisions = [(rev, rev) for rev in args.revisions] if args.revisions else release_revisions()
+
+    # (label, commit, date, library, scale, path or (revision, repository path))
+    pending = []
+    for label, revision in revisions:
+        commit = git('rev-parse', f"{revision}^{{commit}}")
+        date = git('log', '-1', '--format=%cI', commit)
+        for repo_path in git('ls-tree', '--name-only', commit, 'symbols/').split():
+            if repo_path.endswith('.kicad_sym'):
+                pending.append((label, commit, date, Path(repo_path).stem, 1, (commit, repo_path)))
+    if args.corpus:
+        head = git('rev-parse', 'HEAD')
+        date = git('log', '-1', '--format=%cI', head)
+        for scale_dir in sorted(Path(args.corpus_dir).glob('x*'), key=lambda p: int(p.name[1:])):
+            for path in sorted(scale_dir.glob('*.kicad_sym')):
+                pending.append((scale_dir.name, head, date, path.stem, int(scale_dir.name[1:]), path))
+
+    with tempfile.TemporaryDirectory(prefix='loadtime-') as tmp_dir:
+        for label, commit, date, library, scale, source in pending:
+            if (env, commit, library, scale) in known and not args.force:
+                STATS.count('cache_hits')
+                continue
+            if isinstance(source, tuple):
+                path = Path(tmp_dir) / f"{library}.kicad_sym"
+                path.write_bytes(git_show(*source))
+            else:
+                path = source
+            with STATS.phase('measure'):
+                measured = measure_in_subprocess(path, args.repeat)
+            record = LoadRecord(env=env, label=label, commit=commit, date=date,
+                                library=library, scale=scale, **measured)
+            history = [r for r in history
+                       if (r.env, r.commit, r.library, r.scale) != (env, commit, library, scale)]
+            history.append(record)
+            save_history(history_path, history)
+            STATS.count('libraries')
+            print(f"{label:<16} {library:<36} {record.parse_s * 1e3:9.1f} ms "
+                  f"{record.peak_rss_kb / 1024:8.1f} MB peak {record.held_kb / 1024:8.1f} MB held "
+                  f"{record.lookup_us:9.1f} us/lookup")
+    print(f"History: {history_path}")
+
+
+# -- report -----------------------------------------------------------------
+
+def release_series(history: List[LoadRecord]) -> Dict[Tuple[str, str], List[LoadRecord]]:
+    """Real-library records by (env, library), one per commit, oldest first."""
+    series: Dict[Tuple[str, str], Dict[str, LoadRecord]] = {}
+    for record in history:
+        if record.scale == 1:
+            series.setdefault((record.env, record.library), {})[record.commit] = record
+    return {key: sorted(points.values(), key=lambda r: r.date) for key, points in series.items()}
+
+
+def scale_series(history: List[LoadRecord]) -> Dict[Tuple[str, str, str], List[LoadRecord]]:
+    """
+    Corpus records by (env, library, commit), smallest scale first.
+
+    The real library is left out: its symbols carry more text per pin than the
+    synthetic ones, so only corpora are compared with each other.
+    """
+    series: Dict[Tuple[str, str, str], Dict[int, LoadRecord]] = {}
+    for record in history:
+        if record.scale > 1:
+            series.setdefault((record.env, record.library, record.commit), {})[record.scale] = record
+    return {key: [points[s] for s in sorted(points)] for key, points in series.items()}
+
+
+def find_regressions(points: List[LoadRecord], tolerance: float) -> List[str]:
+    """
+    Compare consecutive points: each cost may grow at most as fast as its content.
+
+    A cost that grows by a factor more than (1 + tolerance) times the growth of
+    its content (bytes for parse time and memory, symbols for lookups) is a
+    regression.
+    """
+    problems = []
+    for before, after in zip(points, points[1:]):
+        for cost, content, title, _, _ in COST_METRICS:
+            cost_before, cost_after = getattr(before, cost), getattr(after, cost)
+            content_before, content_after = getattr(before, content), getattr(after, content)
+            if cost_before <= 0 or content_before <= 0 or content_after <= 0:
+                continue
+            cost_growth = cost_after / cost_before
+            content_growth = content_after / content_before
+            if cost_growth > content_growth * (1 + tolerance):
+                problems.append(f"{after.library} {before.label} -> {after.label}: {title.lower()} "
+                                f"x{cost_growth:.2f} for x{content_growth:.2f} {content}")
+    return problems
+
+
+def trend_chart(series: Dict[Tuple[str, str], List[LoadRecord]]) -> str:
+    """SVG chart of each cost per unit of content across releases, one line per library."""
+    canvas = SvgCanvas(scale=6.0, background='#ffffff')
+    labels: Dict[str, str] = {}
+    for points in series.values():
+        for record in points:
+            labels.setdefault(record.commit, record.date + ' ' + record.label)
+    columns = {commit: i for i, commit in enumerate(sorted(labels, key=labels.get))}
+    width, height, gap = 160.0, 50.0, 22.0
+    step = width / max(len(columns) - 1, 1)
+
+    for panel, (cost, content, title, unit, factor) in enumerate(COST_METRICS):
+        top = panel * (height + gap)
+        lines = []
+        for points in series.values():
+            line = [(columns[r.commit] * step, getattr(r, cost) / getattr(r, content) * factor)
+                    for r in points if getattr(r, content)]
+            lines.append((points[0].library, line))
+        peak = max((v for _, line in lines for _, v in line), default=0.0) or 1.0
+        canvas.text(0, top - 4, f"{title} ({unit})", '#000000', 3.0, anchor='start')
+        canvas.line([(0, top), (0, top + height), (width, top + height)], '#000000', 0.2)
+        canvas.text(-1, top, f"{peak:.3g}", '#555555', 2.0, anchor='end')
+        canvas.text(-1, top + height, "0", '#555555', 2.0, anchor='end')
+        for commit, column in columns.items():
+            canvas.text(column * step, top + height + 2, labels[commit].split()[-1], '#555555', 2.0,
+                        anchor='end', angle=45)
+        for i, (library, line) in enumerate(lines):
+            color = LINE_COLORS[i % len(LINE_COLORS)]
+            points = [(x, top + height * (1 - v / peak)) for x, v in line]
+            if len(points) > 1:
+                canvas.line(points, color, 0.4)
+            for x, y in points:
+                canvas.circle(x, y, 0.6, color, 0.2, fill=color)
+            if panel == 0:
+                canvas.text(width + 4, top + 4 * i, library, color, 2.5, anchor='start')
+    return canvas.to_svg(margin=4.0)
+
+
+def _print_points(title: str, column: str, points: List[Tuple[str, LoadRecord]]) -> None:
+    print(title)
+    print(f"  {column:<16} {'symbols':>8} {'pins':>7} {'KB':>8} {'parse ms':>9} "
+          f"{'peak MB':>8} {'held MB':>8} {'lookup us':>10}")
+    for label, r in points:
+        print(f"  {label:<16} {r.symbols:>8} {r.pins:>7} {r.bytes / 1024:>8.0f} {r.parse_s * 1e3:>9.1f} "
+              f"{r.peak_rss_kb / 1024:>8.1f} {r.held_kb / 1024:>8.1f} {r.lookup_us:>10.1f}")
+
+
+def cmd_pins(args):
+    """Handle the 'pins' command."""
+    paths = [Path(p) for p in args.libraries] or sorted(SYMBOLS_DIR.glob('*.kicad_sym'))
+    totals = {'pins': 0, 'table_kb': 0.0, 'objects_kb': 0.0, 'table_ms': 0.0, 'objects_ms': 0.0}
+    print(f"{'library':<32} {'pins':>6} {'table KiB':>10} {'objects KiB':>12} {'table ms':>9} {'objects ms':>11}")
+    for path in paths:
+        result = measure_pin_storage(path, args.repeat)
+        for key in totals:
+            totals[key] += result[key]
+        print(f"{path.stem:<32} {result['pins']:>6} {result['table_kb']:>10.1f} {result['objects_kb']:>12.1f} "
+              f"{result['table_ms']:>9.1f} {result['objects_ms']:>11.1f}")
+    if len(paths) > 1:
+        print(f"{'total':<32} {totals['pins']:>6} {totals['table_kb']:>10.1f} {totals['objects_kb']:>12.1f} "
+              f"{totals['table_ms']:>9.1f} {totals['objects_ms']:>11.1f}")
+
+
+def cmd_report(args):
+    """Handle the 'report' command."""
+    history = load_history(Path(args.history))
+    if not history:
+        print(f"No measurements in {args.history}; run 'record' first")
+        sys.exit(1)
+    releases = release_series(history)
+    scales = scale_series(history)
+
+    problems = []
+    for (env, library), points in sorted(releases.items()):
+        _print_points(f"{library} ({env})", 'release', [(r.label, r) for r in points])
+        problems.extend(find_regressions(points, args.tolerance))
+    for (env, library, commit), points in sorted(scales.items()):
+        _print_points(f"{library} at {commit[:12]}, by scale ({env})", 'scale',
+                      [(f"x{r.scale}", r) for r in points])
+        problems.extend(find_regressions(points, args.tolerance))
+
+    if args.chart:
+        chart = Path(args.chart)
+        chart.parent.mkdir(parents=True, exist_ok=True)
+        chart.write_text(trend_chart(releases), encoding='utf-8')
+        print(f"Chart: {chart}")
+
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    sys.exit(1 if problems else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Library load-time tracking for Nordic KiCad Library",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    add_instrumentation_arguments(parser)
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    # Corpus command
+    corpus_parser = subparsers.add_parser('corpus', help='Write synthetic libraries at larger scales')
+    corpus_parser.add_argument('--scales', type=int, nargs='+', default=list(CORPUS_SCALES),
+                               help='Multiples of today\'s symbol and pin counts (default: 10 100 1000)')
+    corpus_parser.add_argument('--symbols-dir', default=str(SYMBOLS_DIR),
+                               help='Libraries whose symbol and pin counts are reproduced')
+    corpus_parser.add_argument('--output-dir', '-o', default=str(CORPUS_DIR),
+                               help='Directory for the x<scale>/ corpora')
+    corpus_parser.add_argument('--force', action='store_true',
+                               help='Rewrite corpora that are up to date')
+    corpus_parser.set_defaults(func=cmd_corpus)
+
+    # Record command
+    record_parser = subparsers.add_parser('record', help='Measure libraries into the history file')
+    record_parser.add_argument('revisions', nargs='*',
+                               help='Git revisions to measure (default: every tag, then HEAD)')
+    record_parser.add_argument('--corpus', action='store_true',
+                               help='Also measure the synthetic corpora, as of HEAD')
+    record_parser.add_argument('--corpus-dir', default=str(CORPUS_DIR),
+                               help='Directory holding the x<scale>/ corpora')
+    record_parser.add_argument('--history', default=str(HISTORY_PATH),
+                               help='History file (JSON lines)')
+    record_parser.add_argument('--repeat', type=int, default=5,
+                               help='Parses per library; the fastest is recorded')
+    record_parser.add_argument('--force', action='store_true',
+                               help='Measure again even if already in the history')
+    record_parser.set_defaults(func=cmd_record)
+
+    # Report command
+    report_parser = subparsers.add_parser('report',
+                                          help='Show the trend; exit 1 if cost outgrows content')
+    report_parser.add_argument('--history', default=str(HISTORY_PATH),
+                               help='History file (JSON lines)')
+    report_parser.add_argument('--chart', default=str(OUTPUT_DIR / 'trend.svg'),
+                               help='SVG chart of the release trend (empty to skip)')
+    report_parser.add_argument('--tolerance', type=float, default=0.25,
+                               help='Allowed excess of cost growth over content growth (default: 0.25)')
+    report_parser.set_defaults(func=cmd_report)
+
+    # Pins command
+    pins_parser = subparsers.add_parser('pins',
+                                        help='Compare pin memory as a PinTable and as PinDefinition objects')
+    pins_parser.add_argument('libraries', nargs='*',
+                             help='.kicad_sym files (default: every library in symbols/)')
+    pins_parser.add_argument('--repeat', type=int, default=5,
+                             help='Builds per library; the fastest is reported')
+    pins_parser.set_defaults(func=cmd_pins)
+
+    # Measure command (used by 'record' in a fresh interpreter)
+    measure_parser = subparsers.add_parser('measure', help='Measure one library file, as JSON')
+    measure_parser.add_argument('library', help='.kicad_sym file')
+    measure_parser.add_argument('--repeat', type=int, default=5,
+                                help='Parses; the fastest is reported')
+    measure_parser.set_defaults(func=cmd_measure)
+
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    run_instrumented(args, parser)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""
+Preview Rendering Utilities for Nordic KiCad Library
+
+Draws symbols and footprints to SVG straight from the library files, with no
+KiCad installation. It enables:
+- Rendering every symbol (all units) and footprint of the given libraries
+- Before/after image pairs for just the symbols and footprints changed
+  between two git revisions, for reviewing pull requests
+
+Rendered SVGs are cached by entity content hash, so only changed entities
+are drawn again.
+
+Usage:
+    # Render all symbols of a library and all footprints of a .pretty directory
+    python render_utils.py render symbols/nordic-lib-kicad-nrf54l.kicad_sym footprints/nordic-lib-kicad-nrf54l.pretty
+
+    # Before/after pairs for entities changed since main (working tree vs main)
+    python render_utils.py diff --base main --output-dir build/render-diff
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import math
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple, Iterator
+
+from symbol_utils import (
+    STATS, REPO_ROOT, PinRow, iter_sexpr_elements, iter_symbol_pins, sexpr_field, unit_suffix,
+    add_instrumentation_arguments, add_jobs_argument, run_instrumented, parallel_map,
+    atomic_write, git, git_show,
+)
+from block_utils import flatten_derived
+
+
+CACHE_DIR = REPO_ROOT / ".cache" / "render"
+OUTPUT_DIR = REPO_ROOT / "build" / "render"
+
+# Bump when the drawing code changes, to invalidate cached SVGs
+RENDER_VERSION = 1
+
+# Pixels per millimetre in the width/height of the written SVGs
+SYMBOL_SCALE = 8
+FOOTPRINT_SCALE = 60
+
+# KiCad default schematic colours
+SYMBOL_COLORS = {
+    'background': '#FFFFFF',
+    'body': '#840000',
+    'body_fill': '#FFFFC2',
+    'pin': '#840000',
+    'pin_name': '#006464',
+    'pin_number': '#A90000',
+    'text': '#006464',
+}
+
+# KiCad default PCB colours, in drawing order (bottom to top)
+FOOTPRINT_LAYERS = {
+    'B.CrtYd': '#26E9FF', 'B.Fab': '#585D84', 'B.Cu': '#4D7FC4', 'B.SilkS': '#E8B2A7',
+    'F.CrtYd': '#FF26E2', 'F.Fab': '#AFAFAF', 'F.Cu': '#C83434', 'F.SilkS': '#F2EDA1',
+}
+FOOTPRINT_BACKGROUND = '#001023'
+DRILL_COLOR = '#E3B72E'
+
+# Entity kinds and the files they live in
+SYMBOL = 'symbol'
+FOOTPRINT = 'footprint'
+
+
+def _xy(element: List[Any], head: str) -> Tuple[float, float]:
+    item = sexpr_field(element, head)
+    return (float(item[1]), float(item[2])) if item else (0.0, 0.0)
+
+
+def _is_hidden(element: List[Any]) -> bool:
+    hide = sexpr_field(element, 'hide')
+    if hide is not None:
+        return len(hide) < 2 or hide[1] == 'yes'
+    effects = sexpr_field(element, 'effects')
+    return effects is not None and ('hide' in effects or _is_hidden(effects))
+
+
+class SvgCanvas:
+    """Collects SVG primitives in millimetres and tracks their bounding box."""
+
+    def __init__(self, scale: float, background: str):
+        self.scale = scale
+        self.background = background
+        self.items: List[str] = []
+        self.min_x = self.min_y = math.inf
+        self.max_x = self.max_y = -math.inf
+
+    def _extend(self, x: float, y: float, pad: float = 0.0) -> None:
+        self.min_x = min(self.min_x, x - pad)
+        self.min_y = min(self.min_y, y - pad)
+        self.max_x = max(self.max_x, x + pad)
+        self.max_y = max(self.max_y, y + pad)
+
+    def line(self, points: List[Tuple[float, float]], color: str, width: float,
+             fill: Optional[str] = None, closed: bool = False) -> None:
+        for x, y in points:
+            self._extend(x, y, width / 2)
+        tag = 'polygon' if closed else 'polyline'
+        pts = ' '.join(f"{x:.4f},{y:.4f}" for x, y in points)
+        self.items.append(f'<{tag} points="{pts}" fill="{fill or "none"}" stroke="{color}" '
+                          f'stroke-width="{width:.4f}" stroke-linecap="round" stroke-linejoin="round"/>')
+
+    def rect(self, x1: float, y1: float, x2: float, y2: float, color: str, width: float,
+             fill: Optional[str] = None, radius: float = 0.0, angle: float = 0.0) -> None:
+        x, y = min(x1, x2), min(y1, y2)
+        w, h = abs(x2 - x1), abs(y2 - y1)
+        cx, cy = x + w / 2, y + h / 2
+        if angle:
+            self._extend(cx, cy, math.hypot(w, h) / 2 + width / 2)
+        else:
+            self._extend(x, y, width / 2)
+            self._extend(x + w, y + h, width / 2)
+        transform = f' transform="rotate({angle:.2f} {cx:.4f} {cy:.4f})"' if angle else ''
+        self.items.append(f'<rect x="{x:.4f}" y="{y:.4f}" width="{w:.4f}" height="{h:.4f}" '
+                          f'rx="{radius:.4f}" fill="{fill or "none"}" stroke="{color}" '
+                          f'stroke-width="{width:.4f}"{transform}/>')
+
+    def circle(self, cx: float, cy: float, r: float, color: str, width: float,
+               fill: Optional[str] = None) -> None:
+        self._extend(cx, cy, r + width / 2)
+        self.items.append(f'<circle cx="{cx:.4f}" cy="{cy:.4f}" r="{r:.4f}" fill="{fill or "none"}" '
+                          f'stroke="{color}" stroke-width="{width:.4f}"/>')
+
+    def arc(self, start: Tuple[float, float], mid: Tuple[float, float], end: Tuple[float, float],
+            color: str, width: float) -> None:
+        """Draw the circular arc from start through mid to end."""
+        (ax, ay), (bx, by), (cx, cy) = start, mid, end
+        d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+        if abs(d) < 1e-9:
+            self.line([start, end], color, width)
+            return
+        ux = ((ax * ax + ay * ay) * (by - cy) + (bx * bx + by * by) * (cy - ay) + (cx * cx + cy * cy) * (ay - by)) / d
+        uy = ((ax * ax + ay * ay) * (cx - bx) + (bx * bx + by * by) * (ax - cx) + (cx * cx + cy * cy) * (bx - ax)) / d
+        r = math.hypot(ax - ux, ay - uy)
+        # Sweep follows the turn direction of start -> mid -> end; the arc is the
+        # large one when mid and the centre are on the same side of the chord
+        turn = (bx - ax) * (cy - by) - (by - ay) * (cx - bx)
+        side_mid = (cx - ax) * (by - ay) - (cy - ay) * (bx - ax)
+        side_centre = (cx - ax) * (uy - ay) - (cy - ay) * (ux - ax)
+        large = 1 if side_mid * side_centre > 0 else 0
+        sweep = 1 if turn > 0 else 0
+        for x, y in (start, mid, end):
+            self._extend(x, y, width / 2)
+        self.items.append(f'<path d="M {ax:.4f} {ay:.4f} A {r:.4f} {r:.4f} 0 {large} {sweep} {cx:.4f} {cy:.4f}" '
+                          f'fill="none" stroke="{color}" stroke-width="{width:.4f}"/>')
+
+    def text(self, x: float, y: float, value: str, color: str, size: float,
+             anchor: str = 'middle', angle: float = 0.0, baseline: str = 'central') -> None:
+        # Approximate the text extent: glyphs are about 0.6 em wide
+        length = len(value) * size * 0.6
+        lo = {'start': 0.0, 'end': -length}.get(anchor, -length / 2)
+        along = (lo, lo + length)
+        across = (-size / 2, size / 2)
+        if angle % 360 == 90:  # reads bottom to top
+            along, across = across, (-along[1], -along[0])
+        elif angle % 360 == 270:
+            along, across = across, along
+        self._extend(x + along[0], y + across[0])
+        self._extend(x + along[1], y + across[1])
+        transform = f' transform="rotate({-angle:.2f} {x:.4f} {y:.4f})"' if angle else ''
+        self.items.append(f'<text x="{x:.4f}" y="{y:.4f}" fill="{color}" font-size="{size:.4f}" '
+                          f'font-family="sans-serif" text-anchor="{anchor}" '
+                          f'dominant-baseline="{baseline}"{transform}>{html.escape(value)}</text>')
+
+    def to_svg(self, margin: float = 1.0) -> str:
+        """Return the SVG document, sized to the drawn content plus a margin."""
+        if self.min_x == math.inf:
+            self.min_x = self.min_y = self.max_x = self.max_y = 0.0
+        x, y = self.min_x - margin, self.min_y - margin
+        w, h = self.max_x - self.min_x + 2 * margin, self.max_y - self.min_y + 2 * margin
+        return '\n'.join([
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{x:.4f} {y:.4f} {w:.4f} {h:.4f}" '
+            f'width="{w * self.scale:.0f}" height="{h * self.scale:.0f}">',
+            f'<rect x="{x:.4f}" y="{y:.4f}" width="{w:.4f}" height="{h:.4f}" fill="{self.background}"/>',
+            *self.items,
+            '</svg>',
+            '',
+        ])
+
+
+def _strip_overbar(name: str) -> str:
+    return name.replace('~{', '').replace('}', '')
+
+
+def _draw_symbol_unit(canvas: SvgCanvas, items: List[List[Any]], pins: List[PinRow], dx: float,
+                      show_names: bool, show_numbers: bool, name_offset: float) -> None:
+    """Draw the graphic items and pins of one unit, shifted right by dx (library Y is up)."""
+    def pt(x: float, y: float) -> Tuple[float, float]:
+        return (x + dx, -y)
+
+    for item in items:
+        head = item[0]
+        stroke = sexpr_field(item, 'stroke')
+        width = float(sexpr_field(stroke, 'width')[1]) if stroke and sexpr_field(stroke, 'width') else 0.0
+        width = width or 0.1524
+        fill = sexpr_field(item, 'fill')
+        fill_type = sexpr_field(fill, 'type')[1] if fill and sexpr_field(fill, 'type') else 'none'
+        fill_color = {'background': SYMBOL_COLORS['body_fill'],
+                      'outline': SYMBOL_COLORS['body']}.get(fill_type)
+
+        if head == 'rectangle':
+            (x1, y1), (x2, y2) = pt(*_xy(item, 'start')), pt(*_xy(item, 'end'))
+            canvas.rect(x1, y1, x2, y2, SYMBOL_COLORS['body'], width, fill_color)
+        elif head == 'polyline':
+            points = [pt(float(xy[1]), float(xy[2])) for xy in sexpr_field(item, 'pts')[1:]]
+            canvas.line(points, SYMBOL_COLORS['body'], width, fill_color)
+        elif head == 'circle':
+            cx, cy = pt(*_xy(item, 'center'))
+            canvas.circle(cx, cy, float(sexpr_field(item, 'radius')[1]), SYMBOL_COLORS['body'], width, fill_color)
+        elif head == 'arc' and sexpr_field(item, 'mid'):
+            canvas.arc(pt(*_xy(item, 'start')), pt(*_xy(item, 'mid')), pt(*_xy(item, 'end')),
+                       SYMBOL_COLORS['body'], width)
+        elif head == 'text' and not _is_hidden(item):
+            at = sexpr_field(item, 'at')
+            x, y = pt(float(at[1]), float(at[2]))
+            # Symbol text angles are stored in tenths of a degree
+            angle = float(at[3]) / 10 if len(at) > 3 else 0.0
+            canvas.text(x, y, _strip_overbar(item[1]), SYMBOL_COLORS['text'], 1.27, angle=angle)
+
+    for pin in pins:
+        if pin.hidden:
+            continue
+        angle, length, x, y = pin.angle, pin.length, pin.x, pin.y
+        ux, uy = round(math.cos(math.radians(angle))), round(math.sin(math.radians(angle)))
+        start, end = pt(x, y), pt(x + ux * length, y + uy * length)
+        canvas.line([start, end], SYMBOL_COLORS['pin'], 0.1524)
+
+        vertical = uy != 0
+        text_angle = 90 if vertical else 0
+        if show_names and pin.name not in ('', '~'):
+            nx, ny = pt(x + ux * (length + name_offset), y + uy * (length + name_offset))
+            if vertical:
+                anchor = 'start' if uy > 0 else 'end'
+            else:
+                anchor = 'start' if ux > 0 else 'end'
+            canvas.text(nx, ny, _strip_overbar(pin.name), SYMBOL_COLORS['pin_name'], 1.27,
+                        anchor=anchor, angle=text_angle)
+        if show_numbers and pin.number:
+            mx, my = (start[0] + end[0]) / 2, (start[1] + end[1]) / 2
+            if vertical:
+                canvas.text(mx - 0.4, my, pin.number, SYMBOL_COLORS['pin_number'], 1.0,
+                            angle=text_angle, baseline='text-after-edge')
+            else:
+                canvas.text(mx, my - 0.4, pin.number, SYMBOL_COLORS['pin_number'], 1.0,
+                            baseline='text-after-edge')
+
+
+def render_symbol(element: List[Any]) -> str:
+    """Render a (flattened) library symbol to SVG, with its units side by side."""
+    canvas = SvgCanvas(SYMBOL_SCALE, SYMBOL_COLORS['background'])
+    pin_names = sexpr_field(element, 'pin_names')
+    pin_numbers = sexpr_field(element, 'pin_numbers')
+    show_names = pin_names is None or not ('hide' in pin_names or _is_hidden(pin_names))
+    show_numbers = pin_numbers is None or not ('hide' in pin_numbers or _is_hidden(pin_numbers))
+    offset = sexpr_field(pin_names, 'offset') if pin_names else None
+    name_offset = float(offset[1]) if offset else 0.508
+
+    common: List[List[Any]] = []
+    units: Dict[int, List[List[Any]]] = {}
+    for unit in element[2:]:
+        if not isinstance(unit, list) or unit[0] != 'symbol':
+            continue
+        unit_id, style = unit_suffix(unit[1])
+        if style > 1:
+            continue  # De Morgan alternate body style
+        items = [item for item in unit[2:] if isinstance(item, list) and item[0] != 'pin']
+        if unit_id == 0:
+            common.extend(items)
+        else:
+            units.setdefault(unit_id, []).extend(items)
+
+    pins = [pin for _, pin in iter_symbol_pins([element]) if pin.body_style <= 1]
+    for unit_id in sorted(units) or [0]:
+        items = common + units.get(unit_id, [])
+        unit_pins = [pin for pin in pins if pin.unit in (0, unit_id)]
+        dx = 0.0
+        if canvas.max_x != -math.inf:
+            # Measure the unit first so it can be placed right of the previous ones
+            probe = SvgCanvas(SYMBOL_SCALE, SYMBOL_COLORS['background'])
+            _draw_symbol_unit(probe, items, unit_pins, 0.0, show_names, show_numbers, name_offset)
+            if probe.min_x != math.inf:
+                dx = canvas.max_x + 5.08 - probe.min_x
+        _draw_symbol_unit(canvas, items, unit_pins, dx, show_names, show_numbers, name_offset)
+    return canvas.to_svg(margin=2.54)
+
+
+def _pad_layers(pad: List[Any]) -> List[str]:
+    layers = sexpr_field(pad, 'layers')
+    names = layers[1:] if layers else []
+    result = []
+    for name in names:
+        if name in ('*.Cu', 'F&B.Cu'):
+            result.extend(['F.Cu', 'B.Cu'])
+        elif name.endswith('.Cu'):
+            result.append(name)
+    return result
+
+
+def _rotate(x: float, y: float, angle: float) -> Tuple[float, float]:
+    """Rotate a footprint point by angle degrees (KiCad: counter-clockwise on screen)."""
+    if not angle:
+        return x, y
+    a = math.radians(-angle)
+    return x * math.cos(a) - y * math.sin(a), x * math.sin(a) + y * math.cos(a)
+
+
+def _draw_pad(canvas: SvgCanvas, pad: List[Any], color: str) -> None:
+    at = sexpr_field(pad, 'at')
+    x, y = float(at[1]), float(at[2])
+    angle = float(at[3]) if len(at) > 3 else 0.0
+    w, h = _xy(pad, 'size')
+    shape = pad[3]
+
+    if shape == 'circle':
+        canvas.circle(x, y, w / 2, color, 0.0, color)
+    elif shape == 'custom':
+        for primitive in (sexpr_field(pad, 'primitives') or [])[1:]:
+            if isinstance(primitive, list) and primitive[0] == 'gr_poly':
+                points = [_rotate(float(xy[1]), float(xy[2]), angle) for xy in sexpr_field(primitive, 'pts')[1:]]
+                canvas.line([(x + px, y + py) for px, py in points], color, 0.0, color, closed=True)
+        canvas.rect(x - w / 2, y - h / 2, x + w / 2, y + h / 2, color, 0.0, color, angle=-angle)
+    else:
+        if shape == 'oval':
+            radius = min(w, h) / 2
+        elif shape == 'roundrect':
+            ratio = sexpr_field(pad, 'roundrect_rratio')
+            radius = min(w, h) * (float(ratio[1]) if ratio else 0.25)
+        else:
+            radius = 0.0
+        canvas.rect(x - w / 2, y - h / 2, x + w / 2, y + h / 2, color, 0.0, color, radius, angle=-angle)
+
+    drill = sexpr_field(pad, 'drill')
+    if drill is not None:
+        sizes = [float(v) for v in drill[1:] if isinstance(v, str) and v != 'oval']
+        if sizes:
+            canvas.circle(x, y, min(sizes) / 2, DRILL_COLOR, 0.0, FOOTPRINT_BACKGROUND)
+
+    number = pad[1]
+    if number:
+        size = min(w, h) * 0.5
+        canvas.text(x, y, number, '#FFFFFF', size)
+
+
+def render_footprint(element: List[Any]) -> str:
+    """Render a footprint (pads, lines, rectangles, circles, arcs, polygons) to SVG."""
+    canvas = SvgCanvas(FOOTPRINT_SCALE, FOOTPRINT_BACKGROUND)
+    items = [item for item in element[1:] if isinstance(item, list)]
+
+    for layer, color in FOOTPRINT_LAYERS.items():
+        for item in items:
+            head = item[0]
+            if head == 'pad':
+                if layer.endswith('.Cu') and layer in _pad_layers(item) and (
+                        layer == 'F.Cu' or 'F.Cu' not in _pad_layers(item)):
+                    _draw_pad(canvas, item, color)
+                continue
+
+            item_layer = sexpr_field(item, 'layer')
+            if item_layer is None or item_layer[1] != layer:
+                continue
+            stroke = sexpr_field(item, 'stroke')
+            width = sexpr_field(stroke, 'width') if stroke else sexpr_field(item, 'width')
+            width = float(width[1]) if width else 0.1
+            fill = sexpr_field(item, 'fill')
+            filled = fill is not None and fill[1] in ('yes', 'solid')
+            fill_color = color if filled else None
+
+            if head == 'fp_line':
+                canvas.line([_xy(item, 'start'), _xy(item, 'end')], color, width)
+            elif head == 'fp_rect':
+                (x1, y1), (x2, y2) = _xy(item, 'start'), _xy(item, 'end')
+                canvas.rect(x1, y1, x2, y2, color, width, fill_color)
+            elif head == 'fp_circle':
+                (cx, cy), (ex, ey) = _xy(item, 'center'), _xy(item, 'end')
+                canvas.circle(cx, cy, math.hypot(ex - cx, ey - cy), color, width, fill_color)
+            elif head == 'fp_arc' and sexpr_field(item, 'mid'):
+                canvas.arc(_xy(item, 'start'), _xy(item, 'mid'), _xy(item, 'end'), color, width)
+            elif head == 'fp_poly':
+                points = [(float(xy[1]), float(xy[2])) for xy in sexpr_field(item, 'pts')[1:]]
+                canvas.line(points, color, width, fill_color, closed=True)
+            elif head in ('fp_text', 'property') and not _is_hidden(item):
+                at = sexpr_field(item, 'at')
+                value = item[2] if head == 'fp_text' or len(item) > 2 else ''
+                value = value.replace('${REFERENCE}', 'REF**')
+                font = sexpr_field(sexpr_field(item, 'effects') or [], 'font') if sexpr_field(item, 'effects') else None
+                size = float(sexpr_field(font, 'size')[2]) if font and sexpr_field(font, 'size') else 1.0
+                angle = float(at[3]) if len(at) > 3 else 0.0
+                canvas.text(float(at[1]), float(at[2]), value, color, size, angle=angle)
+
+    return canvas.to_svg(margin=0.5)
+
+
+def iter_symbol_entities(library_path: str, library: Optional[str] = None) -> Iterator[Tuple[str, str, str, List[Any]]]:
+    """Yield (kind, library, name, element) for every symbol, derived ones flattened."""
+    library = library or Path(library_path).stem
+    elements = {element[1]: element for element in iter_sexpr_elements(library_path, heads=('symbol',))}
+    for name, element in elements.items():
+        extends = sexpr_field(element, 'extends')
+        if extends is not None and extends[1] in elements:
+            element = flatten_derived(element, elements[extends[1]])
+        yield SYMBOL, library, name, element
+
+
+def iter_footprint_entities(path: str, library: Optional[str] = None) -> Iterator[Tuple[str, str, str, List[Any]]]:
+    """Yield (kind, library, name, element) for a .kicad_mod file or every file of a .pretty directory."""
+    files = sorted(Path(path).glob('*.kicad_mod')) if Path(path).is_dir() else [Path(path)]
+    for file in files:
+        element = next(iter_sexpr_elements(str(file), depth=0))
+        yield FOOTPRINT, library or file.parent.stem, element[1], element
+
+
+def load_entities(path: str, library: Optional[str] = None) -> List[Tuple[str, str, str, List[Any]]]:
+    """Load the renderable entities of a .kicad_sym, .kicad_mod or .pretty path."""
+    if path.endswith('.kicad_sym'):
+        return list(iter_symbol_entities(path, library))
+    return list(iter_footprint_entities(path, library))
+
+
+def entity_hash(kind: str, element: List[Any]) -> str:
+    """Hash an entity's content together with the renderer version."""
+    data = json.dumps([RENDER_VERSION, kind, element], separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _render_task(task: Tuple[str, List[Any]]) -> str:
+    kind, element = task
+    return render_symbol(element) if kind == SYMBOL else render_footprint(element)
+
+
+def render_entities(entities: List[Tuple[str, str, str, List[Any]]],
+                    cache_dir: Optional[Path] = CACHE_DIR, jobs: int = 1) -> List[str]:
+    """
+    Render entities to SVG text, reusing cached SVGs for unchanged content.
+
+    SVGs are cached under cache_dir keyed by entity_hash(); pass
+    cache_dir=None to disable the cache.
+    """
+    hashes = [entity_hash(kind, element) for kind, _, _, element in entities]
+    svgs: Dict[str, str] = {}
+    pending: Dict[str, Tuple[str, List[Any]]] = {}
+    for (kind, _, _, element), content_hash in zip(entities, hashes):
+        cache_file = cache_dir / f"{content_hash}.svg" if cache_dir else None
+        if content_hash in svgs or content_hash in pending:
+            continue
+        if cache_file is not None and cache_file.exists():
+            STATS.count('cache_hits')
+            svgs[content_hash] = cache_file.read_text(encoding='utf-8')
+        else:
+            pending[content_hash] = (kind, element)
+
+    with STATS.phase('render'):
+        rendered = parallel_map(_render_task, list(pending.values()), jobs)
+    for content_hash, svg in zip(pending, rendered):
+        svgs[content_hash] = svg
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            with atomic_write(cache_dir / f"{content_hash}.svg") as f:
+                f.write(svg)
+
+    return [svgs[content_hash] for content_hash in hashes]
+
+
+def _entity_stem(kind: str, library: str, name: str) -> str:
+    """Output path (without extension) of an entity, mirroring the repository layout."""
+    name = name.replace('/', '_').replace('\\', '_')
+    return f"symbols/{library}/{name}" if kind == SYMBOL else f"footprints/{library}.pretty/{name}"
+
+
+def changed_library_files(base: str, head: Optional[str] = None) -> List[str]:
+    """Repository paths of symbol and footprint files that differ between base and head (or the working tree)."""
+    revs = [base, head] if head else [base]
+    paths = set(git('diff', '--name-only', *revs, '--', 'symbols', 'footprints').split())
+    if head is None:
+        paths.update(git('ls-files', '--others', '--exclude-standard', '--', 'symbols', 'footprints').split())
+    return sorted(p for p in paths if p.endswith(('.kicad_sym', '.kicad_mod')))
+
+
+def _library_of(path: str) -> str:
+    path = Path(path)
+    return path.stem if path.suffix == '.kicad_sym' else path.parent.stem
+
+
+def load_entities_at(path: str, rev: Optional[str]) -> Dict[Tuple[str, str], Tuple[str, str, str, List[Any]]]:
+    """Load a library file's entities at a git revision (None: working tree), keyed by (library, name)."""
+    library = _library_of(path)
+    if rev is None:
+        full_path = REPO_ROOT / path
+        entities = load_entities(str(full_path), library) if full_path.exists() else []
+    else:
+        content = git_show(rev, path)
+        if content is None:
+            return {}  # Added or removed at this revision
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir) / Path(path).name
+            tmp_path.write_bytes(content)
+            entities = load_entities(str(tmp_path), library)
+    return {(entity[1], entity[2]): entity for entity in entities}
+
+
+def cmd_render(args):
+    """Handle the 'render' command."""
+    cache_dir = None if args.no_cache else Path(args.cache_dir)
+    output_dir = Path(args.output_dir)
+
+    entities = []
+    with STATS.phase('parse'):
+        for path in args.paths:
+            entities.extend(load_entities(path))
+    if args.name:
+        entities = [e for e in entities if e[2] in args.name]
+    STATS.count('symbols', sum(1 for e in entities if e[0] == SYMBOL))
+
+    svgs = render_entities(entities, cache_dir, args.jobs)
+    with STATS.phase('serialize'):
+        for (kind, library, name, _), svg in zip(entities, svgs):
+            svg_path = output_dir / f"{_entity_stem(kind, library, name)}.svg"
+            svg_path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(svg_path) as f:
+                f.write(svg)
+    print(f"Rendered {len(entities)} symbols/footprints to {output_dir}")
+
+
+def _diff_index(pairs: List[Tuple[str, str, str, str]]) -> str:
+    rows = []
+    for status, library, name, stem in pairs:
+        before = f'<img src="{html.escape(stem)}.before.svg">' if status != 'added' else ''
+        after = f'<img src="{html.escape(stem)}.after.svg">' if status != 'removed' else ''
+        rows.append(f'<tr><td>{html.escape(library)}<br><b>{html.escape(name)}</b><br>{status}</td>'
+                    f'<td>{before}</td><td>{after}</td></tr>')
+    return '\n'.join([
+        '<!DOCTYPE html>',
+        '<html><head><meta charset="utf-8"><title>Library changes</title>',
+        '<style>td { vertical-align: top; border-bottom: 1px solid #ccc; padding: 8px; } '
+        'img { max-width: 45vw; }</style></head><body>',
+        '<table><tr><th>Entity</th><th>Before</th><th>After</th></tr>',
+        *rows,
+        '</table></body></html>',
+        '',
+    ])
+
+
+def cmd_diff(args):
+    """Handle the 'diff' command."""
+    cache_dir = None if args.no_cache else Path(args.cache_dir)
+    output_dir = Path(args.output_dir)
+
+    changes = []
+    with STATS.phase('parse'):
+        for path in changed_library_files(args.base, args.head):
+            before = load_entities_at(path, args.base)
+            after = load_entities_at(path, args.head)
+            for key in sorted(before.keys() | after.keys()):
+                old, new = before.get(key), after.get(key)
+                if old is None:
+                    changes.append(('added', old, new))
+                elif new is None:
+                    changes.append(('removed', old, new))
+                elif entity_hash(old[0], old[3]) != entity_hash(new[0], new[3]):
+                    changes.append(('modified', old, new))
+
+    entities = [e for _, old, new in changes for e in (old, new) if e is not None]
+    svgs = iter(render_entities(entities, cache_dir, args.jobs))
+
+    pairs = []
+    with STATS.phase('serialize'):
+        for stale in [*output_dir.glob('**/*.before.svg'), *output_dir.glob('**/*.after.svg')]:
+            stale.unlink()  # Drop pairs left over from an earlier diff
+        for status, old, new in changes:
+            kind, library, name, _ = old or new
+            stem = _entity_stem(kind, library, name)
+            (output_dir / stem).parent.mkdir(parents=True, exist_ok=True)
+            if old is not None:
+                with atomic_write(output_dir / f"{stem}.before.svg") as f:
+                    f.write(next(svgs))
+            if new is not None:
+                with atomic_write(output_dir / f"{stem}.after.svg") as f:
+                    f.write(next(svgs))
+            pairs.append((status, library, name, stem))
+            print(f"{status:8s} {kind:9s} {library}:{name}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with atomic_write(output_dir / 'index.html') as f:
+            f.write(_diff_index(pairs))
+
+    head = args.head or 'working tree'
+    print(f"{len(pairs)} changed symbols/footprints between {args.base} and {head} -> "
+          f"{output_dir / 'index.html'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="SVG preview rendering for Nordic KiCad Library",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    add_instrumentation_arguments(parser)
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    def add_common_arguments(sub, output_dir):
+        sub.add_argument('--output-dir', '-o', default=str(output_dir),
+                         help='Directory for the rendered SVGs')
+        sub.add_argument('--cache-dir', default=str(CACHE_DIR),
+                         help='Cache of rendered SVGs, keyed by entity content hash')
+        sub.add_argument('--no-cache', action='store_true', help='Ignore and do not write the cache')
+        add_jobs_argument(sub)
+
+    # Render command
+    render_parser = subparsers.add_parser('render', help='Render symbols and footprints to SVG')
+    render_parser.add_argument('paths', nargs='+',
+                               help='.kicad_sym files, .pretty directories or .kicad_mod files')
+    render_parser.add_argument('--name', '-n', action='append',
+                               help='Only render this symbol/footprint (repeatable)')
+    add_common_arguments(render_parser, OUTPUT_DIR)
+    render_parser.set_defaults(func=cmd_render)
+
+    # Diff command
+    diff_parser = subparsers.add_parser('diff',
+                                        help='Render before/after pairs for changed symbols and footprints')
+    diff_parser.add_argument('--base', default='main', help='Base git revision (default: main)')
+    diff_parser.add_argument('--head', help='Head git revision (default: working tree)')
+    add_common_arguments(diff_parser, REPO_ROOT / "build" / "render-diff")
+    diff_parser.set_defaults(func=cmd_diff)
+
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    run_instrumented(args, parser)
+
+
+if __name__ == '__main__':
+    main()
@@ -24,13 +24,18 @@ Usage:
 
 import argparse
 import json
+import re
 import sys
 import csv
-import io
+import itertools
+import os
 import subprocess
+import time
+from array import array
+from contextlib import contextmanager
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator, Callable, TextIO
 
 from kiutils.symbol import SymbolLib, Symbol, SymbolPin, SymbolAlternativePin
 from kiutils.items.common import Position, Effects, Font, Property, Fill, Stroke, Justify
@@ -47,6 +52,198 @@ RECT_STROKE_WIDTH = 0.254  # 10mil stroke width for KLC compliance
 RECT_STROKE_TYPE = "default"
 GRID_SIZE = 2.54  # 100mil grid
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class RunStats:
+    """
+    Collects per-phase timing and counters for a single command run.
+
+    Phases are timed with `phase()` (a context manager) or `timed_iter()` (for
+    generators, where only the time spent producing items is charged to the
+    phase). Counters such as bytes_parsed, symbols, pins and cache_hits are
+    bumped with `count()`. Recording is always on; it is cheap enough that the
+    --stats/--trace flags only control whether anything is reported.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals: Dict[str, List[float]] = {}  # name -> [calls, wall, cpu]
+        self.spans: List[Tuple[str, float, float, float, int]] = []  # (name, start, wall, cpu, pid)
+        self.counters: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        """Drop everything recorded so far and restart the run clock."""
+        self.started = time.perf_counter()
+        self.totals.clear()
+        self.spans.clear()
+        self.counters.clear()
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _record(self, name: str, start: float, wall: float, cpu: float, calls: int = 1) -> None:
+        total = self.totals.setdefault(name, [0, 0.0, 0.0])
+        total[0] += calls
+        total[1] += wall
+        total[2] += cpu
+        self.spans.append((name, start, wall, cpu, os.getpid()))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one call of phase `name`."""
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter() - start,
+                         time.process_time() - cpu_start)
+
+    def timed_iter(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Yield from `iterable`, charging only the time spent inside it to `name`."""
+        iterator = iter(iterable)
+        first = time.perf_counter()
+        wall = cpu = 0.0
+        try:
+            while True:
+                start, cpu_start = time.perf_counter(), time.process_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    wall += time.perf_counter() - start
+                    cpu += time.process_time() - cpu_start
+                yield item
+        finally:
+            self._record(name, first, wall, cpu)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the recorded phases, spans and counters as picklable data."""
+        return {'totals': self.totals, 'spans': self.spans, 'counters': self.counters}
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Add the phases, spans and counters recorded by another process."""
+        for name, (calls, wall, cpu) in snapshot['totals'].items():
+            total = self.totals.setdefault(name, [0, 0.0, 0.0])
+            total[0] += calls
+            total[1] += wall
+            total[2] += cpu
+        self.spans.extend(snapshot['spans'])
+        for name, value in snapshot['counters'].items():
+            self.count(name, value)
+
+    def summary(self) -> str:
+        """Format a human-readable summary of phases and counters."""
+        width = max([16, *map(len, self.totals), *map(len, self.counters)])
+        lines = [f"{'Phase':<{width}} {'Calls':>6} {'Wall (ms)':>10} {'CPU (ms)':>10}", "-" * (width + 29)]
+        for name, (calls, wall, cpu) in sorted(self.totals.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<{width}} {calls:>6} {wall * 1000:>10.1f} {cpu * 1000:>10.1f}")
+        lines.append(f"{'total':<{width}} {'':>6} {(time.perf_counter() - self.started) * 1000:>10.1f}")
+        if self.counters:
+            lines.append("")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<{width}} {value:>10}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Return the recorded spans and counters in Chrome trace event format."""
+        events = []
+        for name, start, wall, cpu, pid in self.spans:
+            events.append({
+                'name': name, 'ph': 'X', 'pid': pid, 'tid': 0,
+                'ts': round((start - self.started) * 1e6),
+                'dur': round(wall * 1e6),
+                'args': {'cpu_us': round(cpu * 1e6)},
+            })
+        events.append({
+            'name': 'counters', 'ph': 'C', 'pid': os.getpid(), 'tid': 0,
+            'ts': round((time.perf_counter() - self.started) * 1e6),
+            'args': dict(self.counters),
+        })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+# Statistics for the current run, reported by --stats/--trace
+STATS = RunStats()
+
+
+def _stats_task(task: Tuple[Callable[[Any], Any], Any]) -> Tuple[Any, Dict[str, Any]]:
+    """Run one parallel_map item in a worker and return its result with the worker's STATS."""
+    func, item = task
+    # Workers are reused (and forked workers inherit the parent's STATS), so
+    # record each item from a clean slate
+    STATS.reset()
+    with STATS.phase(func.__name__):
+        result = func(item)
+    return result, STATS.snapshot()
+
+
+def parallel_map(func: Callable[[Any], Any], items: List[Any], jobs: int) -> List[Any]:
+    """
+    Map func over items in a process pool, or serially for one job or one item.
+
+    Each call is timed as a phase named after func, and phases and counters
+    recorded in the workers are merged into STATS, so --stats and --trace
+    report the same totals (including worker CPU time) whatever --jobs is.
+    """
+    if jobs <= 1 or len(items) <= 1:
+        results = []
+        for item in items:
+            with STATS.phase(func.__name__):
+                results.append(func(item))
+        return results
+    # Imported here: the pool machinery costs ~20 ms of start-up that serial
+    # runs (such as the geometry pre-commit hook) never need
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        for result, snapshot in pool.map(_stats_task, [(func, item) for item in items]):
+            STATS.merge(snapshot)
+            results.append(result)
+    return results
+
+
+def add_jobs_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the --jobs option passed to parallel_map."""
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help='Parallel worker processes')
+
+
+@contextmanager
+def atomic_write(path: Path, newline: Optional[str] = None) -> Iterator[TextIO]:
+    """
+    Open a text file for writing that replaces `path` only once fully written.
+
+    Output goes to `<path>.tmp`, which is renamed over `path` on success and
+    removed on error, so an interrupted run never leaves a partial file.
+    """
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline=newline) as f:
+            yield f
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+
+
+def git(*args: str) -> str:
+    """Run git in the repository and return its output; RuntimeError if it fails."""
+    result = subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def git_show(revision: str, path: str) -> Optional[bytes]:
+    """Contents of a repository file at a revision, or None if it does not exist there."""
+    result = subprocess.run(['git', 'show', f"{revision}:{path}"], cwd=REPO_ROOT, capture_output=True)
+    return result.stdout if result.returncode == 0 else None
+
 
 def snap_to_grid(value: float, grid: float = GRID_SIZE) -> float:
     """Snap a value to the nearest grid point (100mil by default)."""
@@ -69,8 +266,6 @@ def parse_pin_name(name: str) -> Tuple[str, int, int]:
     - 7: Decoupling (DEC*, CFLY*)
     - 9: Other
     """
-    import re
-
     name_upper = name.upper().replace('~{', '').replace('}', '')
 
     # Crystal pins
@@ -128,8 +323,6 @@ def parse_pin_number(number: str) -> Tuple[bool, int, str]:
     Returns tuple of (is_numeric, numeric_value, alpha_part) for sorting.
     Handles both numeric (1, 2, 48) and BGA-style (A1, B2, F5) pin numbers.
     """
-    import re
-
     # Try pure numeric first
     if number.isdigit():
         return (True, int(number), '')
@@ -153,6 +346,127 @@ def sort_pins_by_number(pins: List['PinDefinition']) -> List['PinDefinition']:
     return sorted(pins, key=lambda p: parse_pin_number(p.number))
 
 
+# Tokens of a KiCad s-expression: parens, quoted strings (with escapes), bare atoms
+_SEXPR_TOKEN_RE = re.compile(r'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+')
+_SEXPR_ESCAPE_RE = re.compile(r'\\(.)')
+_SEXPR_ESCAPES = {'n': '\n', 't': '\t'}
+
+
+def _sexpr_unescape(match: re.Match) -> str:
+    return _SEXPR_ESCAPES.get(match.group(1), match.group(1))
+
+
+def iter_sexpr_tokens(path: str) -> Iterator[str]:
+    """
+    Yield the tokens of an s-expression file.
+
+    The file is read line by line (KiCad never writes raw newlines inside
+    strings), so memory use does not depend on file size. Parentheses are
+    yielded as '(' and ')'; quoted strings are yielded unquoted and unescaped.
+    """
+    parsed = 0
+    try:
+        with open(path, 'rb') as f:
+            for raw in f:
+                parsed += len(raw)
+                for token in _SEXPR_TOKEN_RE.findall(raw.decode('utf-8')):
+                    if token[0] == '"':
+                        token = token[1:-1]
+                        if '\\' in token:
+                            token = _SEXPR_ESCAPE_RE.sub(_sexpr_unescape, token)
+                    yield token
+    finally:
+        STATS.count('bytes_parsed', parsed)
+
+
+def iter_sexpr_elements(path: str, depth: int = 1,
+                        heads: Optional[Iterable[str]] = None,
+                        within: Optional[str] = None) -> Iterator[List[Any]]:
+    """
+    Stream the elements nested `depth` levels below the root as nested lists.
+
+    Only one element is materialized at a time; elements whose head atom is
+    not in `heads`, or whose parent's head is not `within`, are skipped
+    without being built.
+    """
+    heads = set(heads) if heads is not None else None
+    stack: List[List[Any]] = []
+    level = 0
+    awaiting_head = False
+    parent_head = None
+
+    for token in iter_sexpr_tokens(path):
+        if token == '(':
+            level += 1
+            awaiting_head = True
+            if stack:
+                child: List[Any] = []
+                stack[-1].append(child)
+                stack.append(child)
+            elif level == depth + 1 and (within is None or parent_head == within):
+                stack.append([])
+        elif token == ')':
+            level -= 1
+            awaiting_head = False
+            if stack:
+                element = stack.pop()
+                if not stack:
+                    yield element
+        else:
+            if awaiting_head and level == depth:
+                parent_head = token
+            awaiting_head = False
+            if not stack:
+                continue
+            if heads is not None and len(stack) == 1 and not stack[0] and token not in heads:
+                # Not an element we want; drop it and ignore its children
+                stack.clear()
+            else:
+                stack[-1].append(token)
+
+
+def sexpr_quote(value: str) -> str:
+    """Quote a string for writing into an s-expression file."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def sexpr_field(element: List[Any], head: str) -> Optional[List[Any]]:
+    """First child of a parsed element whose head is `head`, e.g. its ('at', x, y)."""
+    return next((item for item in element[1:] if isinstance(item, list) and item[0] == head), None)
+
+
+def sexpr_children(text: str, start: int) -> Tuple[List[Tuple[str, int, int]], int]:
+    """
+    Locate the direct children of the element that opens at text[start].
+
+    Returns ([(head, child_start, child_end), ...], element_end) as character
+    offsets, for splicing raw text without re-serializing it. Atom children
+    are reported with an empty head.
+    """
+    children = []
+    depth = 0
+    child_start = 0
+    child_head = None
+    for match in _SEXPR_TOKEN_RE.finditer(text, start):
+        token = match.group(0)
+        if token == '(':
+            depth += 1
+            if depth == 2:
+                child_start = match.start()
+                child_head = None
+        elif token == ')':
+            depth -= 1
+            if depth == 1:
+                children.append((child_head or '', child_start, match.end()))
+            elif depth == 0:
+                return children, match.end()
+        elif depth == 2 and child_head is None and text[match.start() - 1] == '(':
+            child_head = token
+        elif depth == 1 and text[match.start() - 1] != '(':
+            children.append(('', match.start(), match.end()))
+    raise ValueError(f"unbalanced s-expression starting at offset {start}")
+
+
 @dataclass
 class PinDefinition:
     """Represents a single pin definition for symbol generation."""
@@ -166,20 +480,14 @@ class PinDefinition:
     @classmethod
     def from_symbol_pin(cls, pin: SymbolPin) -> 'PinDefinition':
         """Create a PinDefinition from a kiutils SymbolPin."""
-        alternates = []
-        for alt in pin.alternatePins:
-            alternates.append({
-                'name': alt.pinName,
-                'electrical_type': alt.electricalType,
-                'graphical_style': alt.graphicalStyle
-            })
         return cls(
             number=pin.number,
             name=pin.name,
             electrical_type=pin.electricalType,
             graphical_style=pin.graphicalStyle,
             hidden=pin.hide,
-            alternates=alternates
+            alternates=[{'name': alt.pinName, 'electrical_type': alt.electricalType,
+                         'graphical_style': alt.graphicalStyle} for alt in pin.alternatePins],
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -187,6 +495,256 @@ class PinDefinition:
         return asdict(self)
 
 
+class _Vocabulary:
+    """Maps a small set of repeated strings to compact integer codes."""
+
+    def __init__(self, values: Tuple[str, ...]):
+        self.values: List[str] = list(values)
+        self.codes: Dict[str, int] = {v: i for i, v in enumerate(values)}
+
+    def code(self, value: str) -> int:
+        """Return the code for a value, registering unknown values on first use."""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(sys.intern(value))
+            self.codes[value] = code
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+
+# KiCad pin electrical types and graphical styles, coded as single bytes
+ELECTRICAL_TYPES = _Vocabulary((
+    'input', 'output', 'bidirectional', 'tri_state', 'passive', 'free',
+    'unspecified', 'power_in', 'power_out', 'open_collector', 'open_emitter',
+    'no_connect',
+))
+GRAPHICAL_STYLES = _Vocabulary((
+    'line', 'inverted', 'clock', 'inverted_clock', 'input_low', 'clock_low',
+    'output_low', 'edge_clock_high', 'non_logic',
+))
+
+
+class PinRow:
+    """Read-only view of one pin in a PinTable.
+
+    Exposes the same attributes as PinDefinition (plus position, angle, length,
+    unit and body style) so it can be used wherever a PinDefinition is expected.
+    """
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'PinTable', index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def number(self) -> str:
+        return self._table.numbers[self._index]
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._index]
+
+    @property
+    def electrical_type(self) -> str:
+        return ELECTRICAL_TYPES[self._table.electrical_types[self._index]]
+
+    @property
+    def graphical_style(self) -> str:
+        return GRAPHICAL_STYLES[self._table.graphical_styles[self._index]]
+
+    @property
+    def hidden(self) -> bool:
+        return bool(self._table.hidden[self._index])
+
+    @property
+    def x(self) -> float:
+        return self._table.x[self._index]
+
+    @property
+    def y(self) -> float:
+        return self._table.y[self._index]
+
+    @property
+    def angle(self) -> float:
+        return self._table.angle[self._index]
+
+    @property
+    def length(self) -> float:
+        return self._table.length[self._index]
+
+    @property
+    def alternates(self) -> List[Dict[str, str]]:
+        return self._table.alternates_of(self._index)
+
+    @property
+    def unit(self) -> int:
+        return self._table.units[self._index]
+
+    @property
+    def body_style(self) -> int:
+        return self._table.body_styles[self._index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization (same layout as PinDefinition)."""
+        return {
+            'number': self.number,
+            'name': self.name,
+            'electrical_type': self.electrical_type,
+            'graphical_style': self.graphical_style,
+            'hidden': self.hidden,
+            'alternates': self.alternates,
+        }
+
+    def __repr__(self) -> str:
+        return f"PinRow(number={self.number!r}, name={self.name!r})"
+
+
+class PinTable:
+    """Column-oriented pin storage.
+
+    Pins are stored column by column instead of one object per pin: numbers and
+    names as interned strings, electrical type and graphical style as byte codes
+    into ELECTRICAL_TYPES/GRAPHICAL_STYLES, and geometry in float arrays.
+    Alternates live in flat columns indexed by alt_offsets, so the alternates of
+    pin i are entries alt_offsets[i]:alt_offsets[i + 1]. Units and body styles
+    are 0 for pins shared by every unit or style, as in the unit names.
+
+    Indexing or iterating yields PinRow views.
+    """
+
+    def __init__(self):
+        self.numbers: List[str] = []
+        self.names: List[str] = []
+        self.electrical_types = array('B')
+        self.graphical_styles = array('B')
+        self.hidden = bytearray()
+        self.x = array('d')
+        self.y = array('d')
+        self.angle = array('d')
+        self.length = array('d')
+        self.units = array('H')
+        self.body_styles = array('B')
+        self.alt_offsets = array('I', [0])
+        self.alt_names: List[str] = []
+        self.alt_electrical_types = array('B')
+        self.alt_graphical_styles = array('B')
+
+    def append(self, number: str, name: str, electrical_type: str = "bidirectional",
+               graphical_style: str = "line", hidden: bool = False,
+               x: float = 0.0, y: float = 0.0, angle: float = 0.0,
+               length: float = PIN_LENGTH,
+               alternates: Iterable[Tuple[str, str, str]] = (),
+               unit: int = 0, body_style: int = 0) -> None:
+        """Append a pin.
+
+        Args:
+            alternates: (name, electrical_type, graphical_style) tuples
+        """
+        self.numbers.append(sys.intern(number))
+        self.names.append(sys.intern(name))
+        self.electrical_types.append(ELECTRICAL_TYPES.code(electrical_type))
+        self.graphical_styles.append(GRAPHICAL_STYLES.code(graphical_style))
+        self.hidden.append(1 if hidden else 0)
+        self.x.append(x)
+        self.y.append(y)
+        self.angle.append(angle)
+        self.length.append(length)
+        self.units.append(unit)
+        self.body_styles.append(body_style)
+        for alt_name, alt_type, alt_style in alternates:
+            self.alt_names.append(sys.intern(alt_name))
+            self.alt_electrical_types.append(ELECTRICAL_TYPES.code(alt_type))
+            self.alt_graphical_styles.append(GRAPHICAL_STYLES.code(alt_style))
+        self.alt_offsets.append(len(self.alt_names))
+
+    def append_sexpr(self, pin: List[Any], unit: int = 0, body_style: int = 0) -> None:
+        """Append a pin from its raw s-expression, as yielded by iter_sexpr_elements."""
+        number = name = ''
+        hidden = False
+        x = y = angle = 0.0
+        length = PIN_LENGTH
+        alternates = []
+        for item in pin[3:]:
+            if not isinstance(item, list):
+                # KiCad 7 and older write a bare 'hide' flag
+                hidden = hidden or item == 'hide'
+                continue
+            head = item[0]
+            if head == 'at':
+                x, y = float(item[1]), float(item[2])
+                angle = float(item[3]) if len(item) > 3 else 0.0
+            elif head == 'length':
+                length = float(item[1])
+            elif head == 'name':
+                name = item[1]
+            elif head == 'number':
+                number = item[1]
+            elif head == 'hide':
+                hidden = len(item) < 2 or item[1] == 'yes'
+            elif head == 'alternate':
+                alternates.append((item[1], item[2], item[3]))
+        self.append(number, name, pin[1], pin[2], hidden, x, y, angle, length, alternates,
+                    unit, body_style)
+
+    def alternates_of(self, index: int) -> List[Dict[str, str]]:
+        """Return the alternates of a pin as PinDefinition-style dicts."""
+        return [
+            {
+                'name': self.alt_names[i],
+                'electrical_type': ELECTRICAL_TYPES[self.alt_electrical_types[i]],
+                'graphical_style': GRAPHICAL_STYLES[self.alt_graphical_styles[i]],
+            }
+            for i in range(self.alt_offsets[index], self.alt_offsets[index + 1])
+        ]
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __getitem__(self, index: int) -> PinRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pin index out of range")
+        return PinRow(self, index)
+
+    def __iter__(self) -> Iterator[PinRow]:
+        for i in range(len(self)):
+            yield PinRow(self, i)
+
+
+def unit_suffix(name: str) -> Tuple[int, int]:
+    """Return (unit, body style) from a unit name such as 'nRF52805-CAXX_1_1'."""
+    _, unit, style = name.rsplit('_', 2)
+    return int(unit), int(style)
+
+
+def iter_symbol_pins(elements: Iterable[List[Any]],
+                     table: Optional[PinTable] = None) -> Iterator[Tuple[str, PinRow]]:
+    """
+    Yield (symbol name, pin) for every pin of the given raw symbol elements.
+
+    Pins of all symbols are appended to `table` (a fresh PinTable if not given)
+    with their unit and body style, and yielded as row views into it. Each
+    element is walked once, so a whole library costs a single tokenizer pass.
+    """
+    if table is None:
+        table = PinTable()
+    for element in elements:
+        for unit in element[2:]:
+            if not isinstance(unit, list) or unit[0] != 'symbol':
+                continue
+            number, style = unit_suffix(unit[1])
+            for pin in unit[2:]:
+                if isinstance(pin, list) and pin[0] == 'pin':
+                    table.append_sexpr(pin, number, style)
+                    STATS.count('pins')
+                    yield element[1], table[len(table) - 1]
+
+
 @dataclass
 class SymbolDefinition:
     """Represents a complete symbol definition for generation."""
@@ -247,17 +805,34 @@ class SymbolParser:
     def __init__(self, library_path: str):
         self.library_path = Path(library_path)
         self.library: Optional[SymbolLib] = None
+        self.pin_tables: Optional[Dict[str, PinTable]] = None
 
     def load(self) -> SymbolLib:
         """Load the symbol library."""
         if self.library is None:
-            self.library = SymbolLib.from_file(str(self.library_path))
+            with STATS.phase('parse'):
+                self.library = SymbolLib.from_file(str(self.library_path))
+            STATS.count('bytes_parsed', self.library_path.stat().st_size)
+            STATS.count('symbols', len(self.library.symbols))
+        else:
+            STATS.count('cache_hits')
         return self.library
 
+    def _iter_symbol_elements(self) -> Iterator[List[Any]]:
+        """Stream the raw top-level symbol elements of the library."""
+        elements = iter_sexpr_elements(str(self.library_path), heads=('symbol',))
+        for element in STATS.timed_iter('parse', elements):
+            STATS.count('symbols')
+            yield element
+
+    def iter_symbols(self) -> Iterator[str]:
+        """Yield symbol names straight from the library file, without loading it."""
+        for element in self._iter_symbol_elements():
+            yield element[1]
+
     def list_symbols(self) -> List[str]:
         """List all symbol names in the library."""
-        lib = self.load()
-        return [s.entryName for s in lib.symbols]
+        return list(self.iter_symbols())
 
     def get_symbol(self, symbol_name: str) -> Optional[Symbol]:
         """Get a specific symbol by name."""
@@ -298,25 +873,30 @@ class SymbolParser:
 
         return info
 
-    def extract_pins(self, symbol_name: str) -> List[PinDefinition]:
-        """Extract all pins from a symbol."""
-        symbol = self.get_symbol(symbol_name)
-        if symbol is None:
-            return []
-
-        pins = []
-        for unit in symbol.units:
-            for pin in unit.pins:
-                pins.append(PinDefinition.from_symbol_pin(pin))
-
-        return pins
+    def iter_pins(self, symbol_name: str,
+                  table: Optional[PinTable] = None) -> Iterator[PinRow]:
+        """
+        Yield the pins of a symbol as they are read from the library file.
 
-    def extract_pin_table(self, symbol_name: str) -> List[Dict[str, Any]]:
-        """Extract pins as a flat table (for CSV export)."""
-        pins = self.extract_pins(symbol_name)
-        table = []
-        for pin in pins:
-            row = {
+        Only the requested symbol is materialized, and reading stops once it
+        has been found. Pins are appended to `table` (a fresh PinTable if not
+        given) and yielded as row views into it. To look at many symbols, use
+        iter_library_pins or extract_pins instead of calling this per symbol.
+        """
+        for element in self._iter_symbol_elements():
+            if element[1] == symbol_name:
+                for _, pin in iter_symbol_pins([element], table):
+                    yield pin
+                return
+
+    def iter_library_pins(self, table: Optional[PinTable] = None) -> Iterator[Tuple[str, PinRow]]:
+        """Yield (symbol name, pin) for every pin in the library, in one streaming pass."""
+        return iter_symbol_pins(self._iter_symbol_elements(), table)
+
+    def iter_pin_rows(self, symbol_name: str) -> Iterator[Dict[str, Any]]:
+        """Yield pins as flat rows (for CSV/JSON/table export)."""
+        for pin in self.iter_pins(symbol_name):
+            yield {
                 'number': pin.number,
                 'name': pin.name,
                 'electrical_type': pin.electrical_type,
@@ -324,37 +904,70 @@ class SymbolParser:
                 'hidden': pin.hidden,
                 'alternates': '; '.join([f"{a['name']}:{a['electrical_type']}" for a in pin.alternates])
             }
-            table.append(row)
-        return table
 
-    def infer_pin_sides(self, symbol_name: str) -> Dict[str, List[PinDefinition]]:
-        """Infer which side each pin belongs to based on position and angle."""
-        symbol = self.get_symbol(symbol_name)
-        if symbol is None:
-            return {'left': [], 'right': [], 'top': [], 'bottom': []}
+    def extract_pins(self, symbol_name: str) -> PinTable:
+        """
+        Extract all pins from a symbol.
+
+        The first call reads the pins of every symbol in one pass and keeps
+        them in pin_tables, so extracting each symbol in turn stays linear.
+        """
+        if self.pin_tables is None:
+            self.pin_tables = {}
+            for element in self._iter_symbol_elements():
+                table = self.pin_tables[element[1]] = PinTable()
+                for _ in iter_symbol_pins([element], table):
+                    pass
+        else:
+            STATS.count('cache_hits')
+        return self.pin_tables.get(symbol_name, PinTable())
+
+    def read_symbol(self, symbol_name: str) -> Optional[Tuple[List[Any], PinTable]]:
+        """
+        Stream the library up to a symbol and return its raw element and pins.
+
+        Reading stops once the symbol has been found; None if it is not in the
+        library. Properties are the element's ('property', key, value, ...) items.
+        """
+        for element in self._iter_symbol_elements():
+            if element[1] == symbol_name:
+                table = PinTable()
+                for _ in iter_symbol_pins([element], table):
+                    pass
+                return element, table
+        return None
+
+    def extract_pin_table(self, symbol_name: str) -> List[Dict[str, Any]]:
+        """Extract pins as a flat table (for CSV export)."""
+        return list(self.iter_pin_rows(symbol_name))
 
+    def infer_pin_sides(self, symbol_name: str,
+                        pins: Optional[PinTable] = None) -> Dict[str, List[PinRow]]:
+        """
+        Infer which side each pin belongs to based on position and angle.
+
+        Pass `pins` when the symbol's pins have already been read.
+        """
         sides = {'left': [], 'right': [], 'top': [], 'bottom': []}
 
-        for unit in symbol.units:
-            for pin in unit.pins:
-                pin_def = PinDefinition.from_symbol_pin(pin)
-                angle = pin.position.angle if pin.position.angle is not None else 0
-
-                # Angle 0 = pointing right (pin on left side)
-                # Angle 180 = pointing left (pin on right side)
-                # Angle 90 = pointing up (pin on bottom)
-                # Angle 270 = pointing down (pin on top)
-                if angle == 0:
-                    sides['left'].append(pin_def)
-                elif angle == 180:
-                    sides['right'].append(pin_def)
-                elif angle == 90:
-                    sides['bottom'].append(pin_def)
-                elif angle == 270:
-                    sides['top'].append(pin_def)
-                else:
-                    # Default to left for unusual angles
-                    sides['left'].append(pin_def)
+        for pin in (self.extract_pins(symbol_name) if pins is None else pins):
+            angle = pin.angle
+
+            # Angle 0 = pointing right (pin on left side)
+            # Angle 180 = pointing left (pin on right side)
+            # Angle 90 = pointing up (pin on bottom)
+            # Angle 270 = pointing down (pin on top)
+            if angle == 0:
+                sides['left'].append(pin)
+            elif angle == 180:
+                sides['right'].append(pin)
+            elif angle == 90:
+                sides['bottom'].append(pin)
+            elif angle == 270:
+                sides['top'].append(pin)
+            else:
+                # Default to left for unusual angles
+                sides['left'].append(pin)
 
         return sides
 
@@ -423,82 +1036,84 @@ class SymbolGenerator:
         unit.styleId = 0
 
         # Sort pins by name if requested
-        left_pins = sort_pins_by_name(definition.left_pins) if sort_pins else definition.left_pins
-        right_pins = sort_pins_by_name(definition.right_pins) if sort_pins else definition.right_pins
-        top_pins = sort_pins_by_name(definition.top_pins) if sort_pins else definition.top_pins
-        bottom_pins = sort_pins_by_name(definition.bottom_pins) if sort_pins else definition.bottom_pins
-
-        # Calculate dimensions based on pin counts
-        # Count only visible pins for spacing calculation
-        left_count = len([p for p in left_pins if not p.hidden])
-        right_count = len([p for p in right_pins if not p.hidden])
-        top_count = len([p for p in top_pins if not p.hidden])
-        bottom_count = len([p for p in bottom_pins if not p.hidden])
-
-        # Calculate rectangle dimensions - ensure grid alignment
-        vertical_pins = max(left_count, right_count)
-        horizontal_pins = max(top_count, bottom_count)
-
-        # Calculate minimum dimensions and snap to grid
-        # Height: need space for all vertical pins plus padding
-        min_height = snap_to_grid(max(vertical_pins * PIN_SPACING + 2 * PIN_SPACING, 10.16))
-        # Width: need space for all horizontal pins plus padding
-        min_width = snap_to_grid(max(horizontal_pins * PIN_SPACING + 4 * PIN_SPACING, 15.24))
-
-        rect_half_height = snap_to_grid(min_height / 2)
-        rect_half_width = snap_to_grid(min_width / 2)
-
-        # Create rectangle with KLC-compliant stroke width
-        rect = SyRect()
-        rect.start = Position(X=-rect_half_width, Y=rect_half_height)
-        rect.end = Position(X=rect_half_width, Y=-rect_half_height)
-        rect.stroke = Stroke(width=RECT_STROKE_WIDTH, type=RECT_STROKE_TYPE)
-        rect.fill = Fill(type="background")
-        unit.graphicItems.append(rect)
-
-        # Calculate pin positions - ensure grid alignment
-        # KLC S4.1: All pins must be on 100mil (2.54mm) grid
-
-        # Left pins (pointing right, angle=0)
-        # Start from top, working down
-        left_x = snap_to_grid(-rect_half_width - PIN_LENGTH)
-        left_y_start = snap_to_grid(rect_half_height - PIN_SPACING)
-        self._add_pins_to_unit_positioned(unit, left_pins,
-                                          base_x=left_x,
-                                          start_y=left_y_start,
-                                          angle=0,
-                                          direction='vertical')
-
-        # Right pins (pointing left, angle=180)
-        right_x = snap_to_grid(rect_half_width + PIN_LENGTH)
-        right_y_start = snap_to_grid(rect_half_height - PIN_SPACING)
-        self._add_pins_to_unit_positioned(unit, right_pins,
-                                          base_x=right_x,
-                                          start_y=right_y_start,
-                                          angle=180,
-                                          direction='vertical')
-
-        # Top pins (pointing down, angle=270)
-        # Center horizontally
-        top_width_needed = len([p for p in top_pins if not p.hidden]) * PIN_SPACING
-        top_x_start = snap_to_grid(-top_width_needed / 2 + PIN_SPACING / 2)
-        top_y = snap_to_grid(rect_half_height + PIN_LENGTH)
-        self._add_pins_to_unit_positioned(unit, top_pins,
-                                          base_x=top_x_start,
-                                          start_y=top_y,
-                                          angle=270,
-                                          direction='horizontal')
-
-        # Bottom pins (pointing up, angle=90)
-        # Center horizontally
-        bottom_width_needed = len([p for p in bottom_pins if not p.hidden]) * PIN_SPACING
-        bottom_x_start = snap_to_grid(-bottom_width_needed / 2 + PIN_SPACING / 2)
-        bottom_y = snap_to_grid(-rect_half_height - PIN_LENGTH)
-        self._add_pins_to_unit_positioned(unit, bottom_pins,
-                                          base_x=bottom_x_start,
-                                          start_y=bottom_y,
-                                          angle=90,
-                                          direction='horizontal')
+        with STATS.phase('sort'):
+            left_pins = sort_pins_by_name(definition.left_pins) if sort_pins else definition.left_pins
+            right_pins = sort_pins_by_name(definition.right_pins) if sort_pins else definition.right_pins
+            top_pins = sort_pins_by_name(definition.top_pins) if sort_pins else definition.top_pins
+            bottom_pins = sort_pins_by_name(definition.bottom_pins) if sort_pins else definition.bottom_pins
+
+        with STATS.phase('layout'):
+            # Calculate dimensions based on pin counts
+            # Count only visible pins for spacing calculation
+            left_count = len([p for p in left_pins if not p.hidden])
+            right_count = len([p for p in right_pins if not p.hidden])
+            top_count = len([p for p in top_pins if not p.hidden])
+            bottom_count = len([p for p in bottom_pins if not p.hidden])
+
+            # Calculate rectangle dimensions - ensure grid alignment
+            vertical_pins = max(left_count, right_count)
+            horizontal_pins = max(top_count, bottom_count)
+
+            # Calculate minimum dimensions and snap to grid
+            # Height: need space for all vertical pins plus padding
+            min_height = snap_to_grid(max(vertical_pins * PIN_SPACING + 2 * PIN_SPACING, 10.16))
+            # Width: need space for all horizontal pins plus padding
+            min_width = snap_to_grid(max(horizontal_pins * PIN_SPACING + 4 * PIN_SPACING, 15.24))
+
+            rect_half_height = snap_to_grid(min_height / 2)
+            rect_half_width = snap_to_grid(min_width / 2)
+
+            # Create rectangle with KLC-compliant stroke width
+            rect = SyRect()
+            rect.start = Position(X=-rect_half_width, Y=rect_half_height)
+            rect.end = Position(X=rect_half_width, Y=-rect_half_height)
+            rect.stroke = Stroke(width=RECT_STROKE_WIDTH, type=RECT_STROKE_TYPE)
+            rect.fill = Fill(type="background")
+            unit.graphicItems.append(rect)
+
+            # Calculate pin positions - ensure grid alignment
+            # KLC S4.1: All pins must be on 100mil (2.54mm) grid
+
+            # Left pins (pointing right, angle=0)
+            # Start from top, working down
+            left_x = snap_to_grid(-rect_half_width - PIN_LENGTH)
+            left_y_start = snap_to_grid(rect_half_height - PIN_SPACING)
+            self._add_pins_to_unit_positioned(unit, left_pins,
+                                              base_x=left_x,
+                                              start_y=left_y_start,
+                                              angle=0,
+                                              direction='vertical')
+
+            # Right pins (pointing left, angle=180)
+            right_x = snap_to_grid(rect_half_width + PIN_LENGTH)
+            right_y_start = snap_to_grid(rect_half_height - PIN_SPACING)
+            self._add_pins_to_unit_positioned(unit, right_pins,
+                                              base_x=right_x,
+                                              start_y=right_y_start,
+                                              angle=180,
+                                              direction='vertical')
+
+            # Top pins (pointing down, angle=270)
+            # Center horizontally
+            top_width_needed = len([p for p in top_pins if not p.hidden]) * PIN_SPACING
+            top_x_start = snap_to_grid(-top_width_needed / 2 + PIN_SPACING / 2)
+            top_y = snap_to_grid(rect_half_height + PIN_LENGTH)
+            self._add_pins_to_unit_positioned(unit, top_pins,
+                                              base_x=top_x_start,
+                                              start_y=top_y,
+                                              angle=270,
+                                              direction='horizontal')
+
+            # Bottom pins (pointing up, angle=90)
+            # Center horizontally
+            bottom_width_needed = len([p for p in bottom_pins if not p.hidden]) * PIN_SPACING
+            bottom_x_start = snap_to_grid(-bottom_width_needed / 2 + PIN_SPACING / 2)
+            bottom_y = snap_to_grid(-rect_half_height - PIN_LENGTH)
+            self._add_pins_to_unit_positioned(unit, bottom_pins,
+                                              base_x=bottom_x_start,
+                                              start_y=bottom_y,
+                                              angle=90,
+                                              direction='horizontal')
 
         return unit
 
@@ -548,6 +1163,7 @@ class SymbolGenerator:
 
     def _create_pin(self, pin_def: PinDefinition, x: float, y: float, angle: float) -> SymbolPin:
         """Create a SymbolPin from a PinDefinition (KLC compliant)."""
+        STATS.count('pins')
         pin = SymbolPin()
         pin.electricalType = pin_def.electrical_type
         pin.graphicalStyle = pin_def.graphical_style
@@ -582,7 +1198,8 @@ class SymbolGenerator:
 
     def save_library(self, library: SymbolLib, output_path: str) -> None:
         """Save a symbol library to file."""
-        library.to_file(output_path)
+        with STATS.phase('serialize'):
+            library.to_file(output_path)
 
 
 class KLCValidator:
@@ -611,13 +1228,29 @@ class KLCValidator:
             cmd.extend(["-c", symbol_name])
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            with STATS.phase('klc-check'):
+                result = subprocess.run(cmd, capture_output=True, text=True)
             output = result.stdout + result.stderr
             return (result.returncode, output)
         except Exception as e:
             return (-1, f"Failed to run KLC checker: {e}")
 
 
+def write_json_array(items: Iterable[Any], stream) -> None:
+    """
+    Write items as a JSON array as they arrive.
+
+    Produces the same text as json.dumps(list(items), indent=2) without
+    holding the whole list in memory.
+    """
+    first = True
+    for item in items:
+        stream.write('[\n  ' if first else ',\n  ')
+        stream.write(json.dumps(item, indent=2).replace('\n', '\n  '))
+        first = False
+    stream.write('[]' if first else '\n]')
+
+
 def cmd_parse(args):
     """Handle the 'parse' command."""
     parser = SymbolParser(args.library)
@@ -658,25 +1291,28 @@ def cmd_pins(args):
         print("Error: --symbol is required for pins command")
         sys.exit(1)
 
-    table = parser.extract_pin_table(args.symbol)
-    if not table:
+    rows = parser.iter_pin_rows(args.symbol)
+    first = next(rows, None)
+    if first is None:
         print(f"No pins found for symbol '{args.symbol}'")
         sys.exit(1)
+    rows = itertools.chain([first], rows)
 
     if args.format == 'csv':
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=['number', 'name', 'electrical_type',
-                                                     'graphical_style', 'hidden', 'alternates'])
+        writer = csv.DictWriter(sys.stdout, fieldnames=['number', 'name', 'electrical_type',
+                                                        'graphical_style', 'hidden', 'alternates'])
         writer.writeheader()
-        writer.writerows(table)
-        print(output.getvalue())
+        for row in rows:
+            writer.writerow(row)
+        print()
     elif args.format == 'json':
-        print(json.dumps(table, indent=2))
+        write_json_array(rows, sys.stdout)
+        print()
     else:
         # Default table format
         print(f"{'Number':<10} {'Name':<20} {'Type':<15} {'Style':<10} {'Hidden':<8} Alternates")
         print("-" * 80)
-        for row in table:
+        for row in rows:
             hidden = 'Yes' if row['hidden'] else ''
             print(f"{row['number']:<10} {row['name']:<20} {row['electrical_type']:<15} "
                   f"{row['graphical_style']:<10} {hidden:<8} {row['alternates']}")
@@ -690,20 +1326,22 @@ def cmd_extract(args):
         print("Error: --symbol is required for extract command")
         sys.exit(1)
 
-    # Get basic symbol info
-    symbol = parser.get_symbol(args.symbol)
-    if not symbol:
+    # Stream the symbol once: properties and pins come from the same element
+    found = parser.read_symbol(args.symbol)
+    if found is None:
         print(f"Symbol '{args.symbol}' not found")
         sys.exit(1)
+    element, pins = found
 
     # Infer pin sides
-    sides = parser.infer_pin_sides(args.symbol)
+    sides = parser.infer_pin_sides(args.symbol, pins)
 
     # Build definition
-    properties = {p.key: p.value for p in symbol.properties}
+    properties = {item[1]: item[2] for item in element[2:]
+                  if isinstance(item, list) and item[0] == 'property'}
 
     definition = SymbolDefinition(
-        name=symbol.entryName,
+        name=element[1],
         reference=properties.get('Reference', 'U'),
         footprint=properties.get('Footprint', ''),
         datasheet=properties.get('Datasheet', ''),
@@ -716,7 +1354,8 @@ def cmd_extract(args):
         bottom_pins=sides['bottom'],
     )
 
-    output = json.dumps(definition.to_dict(), indent=2)
+    with STATS.phase('serialize'):
+        output = json.dumps(definition.to_dict(), indent=2)
 
     if args.output:
         with open(args.output, 'w') as f:
@@ -755,47 +1394,35 @@ def cmd_validate(args):
 def cmd_analyze(args):
     """Handle the 'analyze' command - show pin positions from existing symbols."""
     parser = SymbolParser(args.library)
-    symbol = parser.get_symbol(args.symbol)
+    pins = parser.extract_pins(args.symbol)
 
-    if not symbol:
+    if not pins and args.symbol not in parser.iter_symbols():
         print(f"Symbol '{args.symbol}' not found")
         sys.exit(1)
 
     # Group pins by side based on position and rotation
     sides = {'left': [], 'right': [], 'top': [], 'bottom': []}
 
-    for unit in symbol.units:
-        for pin in unit.pins:
-            x, y = pin.position.X, pin.position.Y
-            rot = pin.position.angle if pin.position.angle is not None else 0
-
-            pin_info = {
-                'number': pin.number,
-                'name': pin.name,
-                'x': x,
-                'y': y,
-                'type': pin.electricalType,
-                'hidden': pin.hide,
-            }
-
-            if rot == 0:
-                sides['left'].append(pin_info)
-            elif rot == 180:
-                sides['right'].append(pin_info)
-            elif rot == 270:
-                sides['top'].append(pin_info)
-            elif rot == 90:
-                sides['bottom'].append(pin_info)
+    for pin in pins:
+        rot = pin.angle
+        if rot == 0:
+            sides['left'].append(pin)
+        elif rot == 180:
+            sides['right'].append(pin)
+        elif rot == 270:
+            sides['top'].append(pin)
+        elif rot == 90:
+            sides['bottom'].append(pin)
 
     # Sort by position
-    sides['left'].sort(key=lambda p: -p['y'])  # top to bottom
-    sides['right'].sort(key=lambda p: -p['y'])
-    sides['top'].sort(key=lambda p: p['x'])  # left to right
-    sides['bottom'].sort(key=lambda p: p['x'])
+    sides['left'].sort(key=lambda p: -p.y)  # top to bottom
+    sides['right'].sort(key=lambda p: -p.y)
+    sides['top'].sort(key=lambda p: p.x)  # left to right
+    sides['bottom'].sort(key=lambda p: p.x)
 
     # Calculate rectangle bounds
-    all_x = [p['x'] for side in sides.values() for p in side]
-    all_y = [p['y'] for side in sides.values() for p in side]
+    all_x = [p.x for side in sides.values() for p in side]
+    all_y = [p.y for side in sides.values() for p in side]
     if all_x and all_y:
         print(f"Pin position bounds: X=[{min(all_x):.2f}, {max(all_x):.2f}], Y=[{min(all_y):.2f}, {max(all_y):.2f}]")
 
@@ -808,8 +1435,66 @@ def cmd_analyze(args):
         print(f"  {'Num':<6} {'Name':<20} {'X':>8} {'Y':>8} {'Type':<12} {'Hidden'}")
         print("  " + "-" * 70)
         for p in pins:
-            hidden = 'HIDDEN' if p['hidden'] else ''
-            print(f"  {p['number']:<6} {p['name']:<20} {p['x']:>8.2f} {p['y']:>8.2f} {p['type']:<12} {hidden}")
+            hidden = 'HIDDEN' if p.hidden else ''
+            print(f"  {p.number:<6} {p.name:<20} {p.x:>8.2f} {p.y:>8.2f} {p.electrical_type:<12} {hidden}")
+
+
+def add_instrumentation_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the global --stats/--trace/--profile flags to a command-line parser."""
+    parser.add_argument('--stats', action='store_true',
+                        help='Print per-phase timing and counters to stderr when done')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Write phase timings as a Chrome trace (chrome://tracing, Perfetto)')
+    parser.add_argument('--profile', choices=['cpu', 'memory'],
+                        help='Capture a cProfile (cpu) or tracemalloc (memory) profile of the command')
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help='Save raw cProfile data (pstats format) to FILE; needs --profile cpu')
+
+
+def run_instrumented(args, parser: argparse.ArgumentParser) -> None:
+    """Run args.func, then report STATS as requested by the instrumentation flags."""
+    if args.profile_output and args.profile != 'cpu':
+        parser.error('--profile-output needs --profile cpu')
+    try:
+        run_profiled(args)
+    finally:
+        if args.stats:
+            print(STATS.summary(), file=sys.stderr)
+        if args.trace:
+            with open(args.trace, 'w') as f:
+                json.dump(STATS.chrome_trace(), f)
+
+
+def run_profiled(args) -> None:
+    """Run the selected command, under cProfile or tracemalloc if requested."""
+    if args.profile == 'cpu':
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(args.func, args)
+        finally:
+            if args.profile_output:
+                profiler.dump_stats(args.profile_output)
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats('cumulative').print_stats(25)
+    elif args.profile == 'memory':
+        import tracemalloc
+
+        tracemalloc.start()
+        try:
+            args.func(args)
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"Memory: {current / 1024:.1f} KiB current, {peak / 1024:.1f} KiB peak",
+                  file=sys.stderr)
+            for stat in snapshot.statistics('lineno')[:15]:
+                print(f"  {stat}", file=sys.stderr)
+    else:
+        args.func(args)
 
 
 def main():
@@ -818,6 +1503,7 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog=__doc__
     )
+    add_instrumentation_arguments(parser)
     subparsers = parser.add_subparsers(dest='command', help='Commands')
 
     # Parse command
@@ -872,7 +1558,7 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    args.func(args)
+    run_instrumented(args, parser)
 
 
 if __name__ == '__main__':